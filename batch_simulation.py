@@ -0,0 +1,188 @@
+import copy
+import numpy as np
+import simulation
+import solver
+
+SIZE = simulation.BOARD_SIZE
+
+# cells hold the kind in the low two bits and the direction code above them, one gather reads both
+KIND_BITS = 2
+KIND_MASK = (1 << KIND_BITS) - 1
+
+# move codes are indices in solver.MOVE_ORDER, the low two bits pick the direction and 4 means pull
+MOVE_VECTORS = np.array([simulation.DIRECTIONS[simulation.MOVE_KEYS[key]] for key in solver.MOVE_ORDER[:4]])
+MOVE_CODES = np.array([simulation.DIRECTION_CODES[tuple(vector)] for vector in MOVE_VECTORS], dtype = np.uint8)
+
+# cells along the ray in front of the player, the longest possible chain plus the cell it moves into
+RAY = np.arange(1, SIZE)
+
+# each ray cell takes the block of the cell before it
+SHIFTED = np.maximum(RAY - 2, 0)
+
+LEVEL_OFFSETS = np.arange(simulation.LEVELS)
+
+class BatchState:
+    def __init__(self, states):
+
+        count = len(states)
+
+        # cells, indexed [board, x, y, level], same order as simulation.index
+        grid = np.stack([np.frombuffer(bytes(state.grid), dtype = np.uint8) for state in states])
+        directions = np.stack([np.frombuffer(bytes(state.directions), dtype = np.uint8) for state in states])
+        self.grid = (grid | directions << KIND_BITS).reshape(count, SIZE, SIZE, simulation.LEVELS)
+
+        # player
+        self.player = np.array([state.player for state in states], dtype = np.int64)
+
+        # stats
+        self.moves_taken = np.array([state.moves_taken for state in states], dtype = np.int64)
+        self.objects_moved = np.array([state.objects_moved for state in states], dtype = np.int64)
+
+        # map data, every board can be a different map
+        self.boards = [state.board for state in states]
+        self.start = np.array([simulation.column(*state.board.start) for state in states])
+        self.end = np.array([simulation.column(*state.board.end) for state in states])
+        self.max_moves = np.array([state.board.max_moves for state in states])
+        self.max_moved = np.array([state.board.max_moved for state in states])
+        self.block_start = np.array([state.board.block_start for state in states])
+        self.enforce_limits = np.array([state.board.enforce_limits for state in states])
+
+    def __len__(self):
+        return len(self.player)
+
+    def copy(self):
+
+        # map data is shared, everything a move changes is copied
+        batch = copy.copy(self)
+        for name in ("grid", "player", "moves_taken", "objects_moved"):
+            setattr(batch, name, getattr(self, name).copy())
+        return batch
+
+    @property
+    def kinds(self):
+        return self.grid & KIND_MASK
+
+    @property
+    def directions(self):
+        return self.grid >> KIND_BITS
+
+    def state(self, i):
+        return simulation.GameState(
+            self.boards[i],
+            bytearray((self.grid[i] & KIND_MASK).tobytes()),
+            bytearray((self.grid[i] >> KIND_BITS).tobytes()),
+            tuple(int(axis) for axis in self.player[i]),
+            int(self.moves_taken[i]),
+            int(self.objects_moved[i]),
+        )
+
+def finished(batch):
+    player = batch.player[:, 0] * SIZE + batch.player[:, 1]
+    return (player == batch.end) | (batch.enforce_limits & (batch.moves_taken >= batch.max_moves))
+
+def solved(batch):
+    player = batch.player[:, 0] * SIZE + batch.player[:, 1]
+    return (player == batch.end) & ~(batch.enforce_limits & (batch.moves_taken >= batch.max_moves))
+
+def _dropColumns(cells, bases):
+
+    # the ground block of these columns left, the stack resting on it falls one level, blocks above a gap stay
+    column = bases[:, None] + LEVEL_OFFSETS
+    levels = cells[column]
+    resting = np.cumprod(levels[:, 1:] != simulation.EMPTY, axis = 1).astype(bool)
+    count = np.count_nonzero(resting, axis = 1)
+    levels[:, :-1] = np.where(resting, levels[:, 1:], levels[:, :-1])
+    levels[np.arange(len(bases)), count] = simulation.EMPTY
+    cells[column] = levels
+    return count
+
+def step(batch, moves):
+
+    # advance every board by one move in place, returns which boards could not move
+    moves = np.asarray(moves)
+    count = len(batch)
+    rows = np.arange(count)
+
+    # flat view, every cell is one index so gathers are plain takes
+    cells_flat = batch.grid.reshape(-1)
+    bases = rows * simulation.GRID_SIZE
+
+    vectors = MOVE_VECTORS[moves & 3]
+    move_codes = MOVE_CODES[moves & 3]
+    pull = moves >= 4
+    player_x = batch.player[:, 0]
+    player_y = batch.player[:, 1]
+
+    # cells in front of the player as (ray cell, board) so reductions run across all boards at once
+    ray_x = player_x + vectors[:, 0] * RAY[:, None]
+    ray_y = player_y + vectors[:, 1] * RAY[:, None]
+    on_board = (ray_x >= 0) & (ray_x < SIZE) & (ray_y >= 0) & (ray_y < SIZE)
+    ray_columns = np.clip(ray_x, 0, SIZE - 1) * SIZE + np.clip(ray_y, 0, SIZE - 1)
+    ray_cells = bases + ray_columns * simulation.LEVELS
+
+    cells = cells_flat[ray_cells]
+    kinds = cells & KIND_MASK
+    codes = cells >> KIND_BITS
+
+    # the chain is every movable block up to the first cell that is not one
+    movable = on_board & ((kinds == simulation.CRATE) | (kinds == simulation.DIRECTION))
+    movable &= (codes == 0) | (codes == move_codes)
+    length = np.argmin(movable, axis = 0)
+    blocked = (kinds[length, rows] != simulation.EMPTY) | ~on_board[length, rows]
+    pushing = length > 0
+
+    # a chain cannot go into a portal, the first cell is fine since nothing is pushed yet
+    reached = RAY[:, None] <= length + 1
+    portals = (ray_columns == batch.end) | (batch.block_start & (ray_columns == batch.start))
+    blocked |= (portals[1:] & reached[1:]).any(axis = 0) & pushing
+
+    # stacks on the chain
+    stacked = (cells_flat[ray_cells + 1] != simulation.EMPTY) & (RAY[:, None] <= length)
+    has_stack = stacked.any(axis = 0)
+    player_blocked = pushing & stacked[0]
+
+    # pulled block behind the player
+    pull_x = player_x - vectors[:, 0]
+    pull_y = player_y - vectors[:, 1]
+    pull_on_board = (pull_x >= 0) & (pull_x < SIZE) & (pull_y >= 0) & (pull_y < SIZE)
+    pull_cells = bases + (np.clip(pull_x, 0, SIZE - 1) * SIZE + np.clip(pull_y, 0, SIZE - 1)) * simulation.LEVELS
+    pull_cell = cells_flat[pull_cells]
+    pull_kind = pull_cell & KIND_MASK
+    pull_code = pull_cell >> KIND_BITS
+    pulling = pull & pull_on_board & (pull_kind != simulation.EMPTY)
+    blocked |= pulling & ((pull_kind == simulation.WALL) | ((pull_code != 0) & (pull_code != move_codes)) | has_stack)
+
+    # move limit and boards that are already over
+    moved = length + pulling
+    blocked |= batch.enforce_limits & (moved > batch.max_moved)
+    blocked |= finished(batch)
+
+    dropped = np.zeros(count, dtype = np.int64)
+
+    # shift every chain one cell along the ray, the first cell is left empty
+    shifting = ~blocked & pushing
+    if shifting.any():
+        chain_cells = ray_cells[:, shifting]
+        inside = reached[:, shifting]
+        values = cells[:, shifting][SHIFTED]
+        values[0] = simulation.EMPTY
+        cells_flat[chain_cells[inside]] = values[inside]
+
+        # gravity, the first chain column lost its ground block
+        dropped[shifting] += _dropColumns(cells_flat, chain_cells[0])
+
+    # the pulled block takes the players old cell and its stack falls
+    pulled = ~blocked & pulling
+    if pulled.any():
+        player_cells = bases[pulled] + (player_x[pulled] * SIZE + player_y[pulled]) * simulation.LEVELS
+        cells_flat[player_cells] = pull_cell[pulled]
+        dropped[pulled] += _dropColumns(cells_flat, pull_cells[pulled])
+
+    batch.objects_moved += (moved + dropped) * ~blocked
+
+    # move
+    walking = ~blocked & ~player_blocked
+    batch.player += vectors * walking[:, None]
+    batch.moves_taken += walking
+
+    return blocked
\ No newline at end of file
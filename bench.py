@@ -0,0 +1,185 @@
+import gc
+import glob
+import json
+import os
+import simulation
+import time
+import tracemalloc
+
+BASELINE_FILE = "bench_baseline.json"
+
+# changes smaller than this are noise
+THRESHOLD = 0.1
+
+def measure(function, teardown = None, min_time = 0.5):
+
+    # calls until min_time has passed, teardown runs outside the timing
+    calls = 0
+    elapsed = 0
+    while elapsed < min_time:
+        start = time.perf_counter()
+        result = function()
+        elapsed += time.perf_counter() - start
+        calls += 1
+        if teardown:
+            teardown(result)
+
+    # allocations of a few more calls, traced separately since tracing slows everything down
+    samples = max(1, min(calls, 50))
+    tracemalloc.start()
+    allocated = 0
+    peak = 0
+
+    # the first traced call fills caches, it is left out
+    for i in range(samples + 1):
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        result = function()
+        if teardown:
+            teardown(result)
+        del result
+        gc.collect()
+        if i == 0:
+            continue
+
+        # kept is what is still allocated once the result is gone
+        current, call_peak = tracemalloc.get_traced_memory()
+        allocated += current - before
+        peak = max(peak, call_peak - before)
+    tracemalloc.stop()
+
+    return {"ops": calls / elapsed, "retained": allocated / samples, "peak": peak}
+
+def _state(blocks, player, pull_block = None):
+
+    board = simulation.Board((1, 1), (10, 10), enforce_limits = False)
+    state = simulation.GameState(board, player = player)
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            if x in (0, simulation.BOARD_SIZE - 1) or y in (0, simulation.BOARD_SIZE - 1):
+                state.setBlock(x, y, 0, simulation.WALL)
+    for x, y, level in blocks:
+        state.setBlock(x, y, level, simulation.CRATE)
+    return state
+
+def ruleBenchmarks():
+
+    # the longest chain that fits, pushed towards the free cell at the end
+    chain = _state([(x, 5, 0) for x in range(2, 10)], (1, 5))
+
+    # a block under a full stack pushed out, the whole stack falls
+    stack = _state([(2, 5, level) for level in range(simulation.LEVELS)], (1, 5))
+
+    # long chain pushed with the pulled block behind the player
+    pull = _state([(x, 5, 0) for x in range(3, 9)] + [(1, 5, 0)], (2, 5))
+
+    # nothing in the way, the most common move
+    walk = _state([], (5, 5))
+
+    # blocked by a wall
+    blocked = _state([], (1, 5))
+
+    return {
+        "step push chain": lambda: simulation.stepKey(chain, "d"),
+        "step gravity stack": lambda: simulation.stepKey(stack, "d"),
+        "step push and pull": lambda: simulation.stepKey(pull, "D"),
+        "step walk": lambda: simulation.stepKey(walk, "d"),
+        "step blocked": lambda: simulation.stepKey(blocked, "a"),
+    }
+
+def editorBenchmarks(folder = "maps"):
+
+    # entities need a running app, headless is enough
+    import blocks
+    import map_helper
+    from ursina import Ursina, application
+    Ursina(window_type = "none")
+
+    files = sorted(glob.glob(os.path.join(folder, "*.json")))
+    boards = [map_helper.loadMap(file) for file in files]
+
+    def _clear(loaded):
+        for board in loaded:
+            map_helper.clearBoard(board)
+
+        # portal animations and their invokes are still pending, they would be counted as kept otherwise
+        for sequence in application.sequences[:]:
+            sequence.kill()
+
+    # every cell and level of every map
+    crate = blocks.CrateBlock(1, 1, 0)
+    def _canPlace():
+        for board in boards:
+            for x in range(1, simulation.BOARD_SIZE - 1):
+                for y in range(1, simulation.BOARD_SIZE - 1):
+                    for level in range(simulation.LEVELS):
+                        crate.x, crate.y, crate.level = x, y, level
+                        map_helper.canPlaceBlock(board, crate)
+
+    # a block walked around the board and up and down
+    keys = "dddddddddsssssssssaaaaaaaaawwwwwwwwweeeeeeqqqqqq"
+    def _edit():
+        for key in keys:
+            map_helper.editBlock(crate, key)
+
+    return {
+        "loadMap every map": (lambda: [map_helper.loadMap(file) for file in files], _clear),
+        "boardToJson every map": lambda: [map_helper.boardToJson(board) for board in boards],
+        "canPlaceBlock every cell": _canPlace,
+        "editBlock walk": _edit,
+    }
+
+def runAll(names = None, min_time = 0.5, editor = True):
+
+    benchmarks = ruleBenchmarks()
+    if editor:
+        benchmarks.update(editorBenchmarks())
+
+    results = {}
+    for name, benchmark in benchmarks.items():
+        if names and not any(part in name for part in names):
+            continue
+        function, teardown = benchmark if isinstance(benchmark, tuple) else (benchmark, None)
+        results[name] = measure(function, teardown, min_time)
+    return results
+
+def compare(results, baseline):
+
+    # one line per benchmark, throughput change against the baseline
+    lines = []
+    for name, result in results.items():
+        line = f"{name:<28}{result['ops']:>14,.0f} ops/s{result['retained'] / 1024:>10.1f} KiB kept{result['peak'] / 1024:>10.1f} KiB peak"
+        if name in baseline:
+            change = result["ops"] / baseline[name]["ops"] - 1
+            flag = " REGRESSION" if change < -THRESHOLD else " faster" if change > THRESHOLD else ""
+            line += f"{change:>+9.1%}{flag}"
+        lines.append(line)
+    return lines
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description = "Benchmark the game logic hot paths headlessly.")
+    parser.add_argument("names", nargs = "*", help = "only benchmarks with one of these in their name")
+    parser.add_argument("--baseline", default = BASELINE_FILE)
+    parser.add_argument("--save", action = "store_true", help = "store the results as the new baseline")
+    parser.add_argument("--min-time", type = float, default = 0.5)
+    parser.add_argument("--rules-only", action = "store_true", help = "skip the benchmarks that need entities")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r") as r:
+            baseline = json.load(r)
+
+    results = runAll(args.names, args.min_time, not args.rules_only)
+    lines = compare(results, baseline)
+    print("\n".join(lines))
+
+    if args.save:
+        with open(args.baseline, "w") as w:
+            json.dump({**baseline, **results}, w, indent = 1)
+        print(f"Saved baseline to {args.baseline}")
+
+    sys.exit(1 if any(line.endswith("REGRESSION") for line in lines) else 0)
\ No newline at end of file
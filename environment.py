@@ -0,0 +1,107 @@
+import batch_simulation
+import glob
+import numpy as np
+import os
+import simulation
+import solver
+
+# actions are indices in solver.MOVE_ORDER, upper case keys pull
+ACTIONS = solver.MOVE_ORDER
+
+# observation planes, a cell is in the plane of its kind, direction blocks get one plane per direction
+PLANES = ("wall", "crate", "direction right", "direction left", "direction up", "direction down")
+
+# packed cell value of every plane, see batch_simulation
+_PLANE_CELLS = np.array(
+    [simulation.WALL, simulation.CRATE] + [simulation.DIRECTION | code << batch_simulation.KIND_BITS for code in range(1, len(simulation.DIRECTION_VECTORS))],
+    dtype = np.uint8,
+)[:, None, None, None]
+
+def loadStates(folder = "maps"):
+    return [simulation.loadState(file) for file in sorted(glob.glob(os.path.join(folder, "*.json")))]
+
+def observe(batch):
+
+    # one row per board: cell planes, end portal plane, player position and moves left
+    planes = batch.grid[:, None] == _PLANE_CELLS
+
+    end = np.zeros((len(batch), simulation.BOARD_SIZE * simulation.BOARD_SIZE), dtype = np.uint8)
+    end[np.arange(len(batch)), batch.end] = 1
+
+    moves_left = np.where(batch.enforce_limits, batch.max_moves - batch.moves_taken, -1)
+
+    return {
+        "cells": planes.view(np.uint8),
+        "end": end.reshape(len(batch), simulation.BOARD_SIZE, simulation.BOARD_SIZE),
+        "player": batch.player.copy(),
+        "moves_left": moves_left,
+    }
+
+class GravkobanEnv:
+    def __init__(self, states, step_penalty = 0.01, seed = None):
+
+        # maps to pick from on every reset
+        self.states = states
+        self.rng = np.random.default_rng(seed)
+
+        # rewards, reaching the end is worth 1
+        self.step_penalty = step_penalty
+
+        self.state = None
+
+    def reset(self, map_index = None):
+
+        index = self.rng.integers(len(self.states)) if map_index is None else map_index
+        self.state = self.states[index]
+        return self._observe()
+
+    def _observe(self):
+
+        # one board batch so single and vectorized observations match exactly
+        observation = observe(batch_simulation.BatchState([self.state]))
+        return {key: value[0] for key, value in observation.items()}
+
+    def step(self, action):
+
+        new_state, diff = simulation.stepKey(self.state, ACTIONS[action])
+        self.state = new_state
+
+        solved = simulation.isSolved(new_state)
+        done = simulation.isFinished(new_state)
+        reward = 1.0 if solved else -self.step_penalty
+
+        return self._observe(), reward, done, {"solved": solved, "blocked": diff is None}
+
+class VectorEnv:
+    def __init__(self, states, count, step_penalty = 0.01):
+
+        # board i always plays states[i % len(states)] and starts over by itself when done
+        self.initial = batch_simulation.BatchState([states[i % len(states)] for i in range(count)])
+        self.batch = None
+
+        self.step_penalty = step_penalty
+
+    def __len__(self):
+        return len(self.initial)
+
+    def _restart(self, rows):
+        for name in ("grid", "player", "moves_taken", "objects_moved"):
+            getattr(self.batch, name)[rows] = getattr(self.initial, name)[rows]
+
+    def reset(self):
+
+        self.batch = self.initial.copy()
+        return observe(self.batch)
+
+    def step(self, actions):
+
+        blocked = batch_simulation.step(self.batch, actions)
+
+        solved = batch_simulation.solved(self.batch)
+        dones = batch_simulation.finished(self.batch)
+        rewards = np.where(solved, 1.0, -self.step_penalty)
+
+        # finished boards start over, the returned observation is already the new episode
+        self._restart(dones)
+
+        return observe(self.batch), rewards, dones, {"solved": solved, "blocked": blocked}
\ No newline at end of file
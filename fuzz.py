@@ -0,0 +1,249 @@
+import batch_simulation
+import multiprocessing
+import numpy as np
+import random
+import simulation
+import solver
+import time
+
+# every this many moves the slow checks run too
+FULL_CHECK_EVERY = 64
+
+FAILURE_FOLDER = "fuzz_failures"
+
+class FuzzFailure(Exception):
+    def __init__(self, message, start, moves):
+        super().__init__(message)
+
+        # everything needed to play the failing run again, map data has no place for the rule flags
+        self.map_data = simulation.stateToMapData(start)
+        self.player = start.player
+        self.block_start = start.board.block_start
+        self.enforce_limits = start.board.enforce_limits
+        self.moves = moves
+
+    def record(self):
+        return {
+            "error": str(self), "map": self.map_data, "player": self.player, "moves": self.moves,
+            "block_start": self.block_start, "enforce_limits": self.enforce_limits,
+        }
+
+def randomState(rng):
+
+    board = simulation.Board((1, 1), (1, 1))
+    state = simulation.GameState(board)
+
+    # board walls
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            if x in (0, simulation.BOARD_SIZE - 1) or y in (0, simulation.BOARD_SIZE - 1):
+                state.setBlock(x, y, 0, simulation.WALL)
+
+    inner = [(x, y) for x in range(1, simulation.BOARD_SIZE - 1) for y in range(1, simulation.BOARD_SIZE - 1)]
+    rng.shuffle(inner)
+
+    # player and portals need empty columns
+    state.player = inner.pop()
+    board.start = state.player if rng.random() < 0.7 else inner.pop()
+    board.end = inner.pop()
+
+    # stacks of crates and direction blocks, sometimes on top of a wall
+    density = rng.choice((0.2, 0.4, 0.6))
+    for x, y in inner:
+        if rng.random() > density:
+            continue
+
+        level = 0
+        if rng.random() < 0.15:
+            state.setBlock(x, y, 0, simulation.WALL)
+            level = 1
+            if rng.random() < 0.8:
+                continue
+
+        # some columns have gaps, blocks above them float, even with nothing on the ground
+        height = rng.choice((1, 1, 1, 2, 3, simulation.LEVELS))
+        gaps = rng.random() < 0.25
+        for level in range(level, min(height, simulation.LEVELS)):
+            if gaps and rng.random() < 0.4:
+                continue
+            if rng.random() < 0.3:
+                state.setBlock(x, y, level, simulation.DIRECTION, rng.choice(simulation.DIRECTION_VECTORS[1:]))
+            else:
+                state.setBlock(x, y, level, simulation.CRATE)
+
+    # game rules, menu rules or anything in between
+    board.block_start = rng.random() < 0.8
+    board.enforce_limits = rng.random() < 0.7
+    board.max_moved = rng.choice((0, 1, 2, 3, 1000))
+    board.max_moves = rng.choice((50, 500, 1000000))
+
+    return state
+
+def _floating(state):
+    return simulation.GRID_SIZE - state.grid.count(simulation.EMPTY) - sum(state.heights)
+
+def checkStep(state, key, new_state, diff):
+
+    # cheap checks after every move, returns a message when something is wrong
+    if diff is None:
+        return None if new_state is state else "blocked move changed the state"
+
+    board = state.board
+    grid = new_state.grid
+
+    # nothing appears or disappears, walls never move
+    for kind in (simulation.WALL, simulation.CRATE, simulation.DIRECTION):
+        if grid.count(kind) != state.grid.count(kind):
+            return f"number of kind {kind} blocks changed, something overlapped"
+    for coord, target in diff.moved + diff.dropped:
+        if state.kindAt(*coord) == simulation.WALL:
+            return f"wall at {coord} moved"
+
+    # blocks can land under floating ones but a move never leaves a block floating that was standing
+    if _floating(new_state) > _floating(state):
+        return "a move left a block floating"
+
+    # the player is never inside a block
+    if grid[simulation.index(*new_state.player)] != simulation.EMPTY:
+        return "player inside a block"
+
+    # the end is never occupied, the start only takes a block the player pulled off it
+    move_x, move_y = simulation.DIRECTIONS[simulation.MOVE_KEYS[key.lower()]]
+    pulled = (state.player[0] - move_x, state.player[1] - move_y, 0)
+    if grid[simulation.index(*board.end)] != simulation.EMPTY:
+        return "block on the end portal"
+    for coord, target in diff.moved:
+        if board.block_start and target[:2] == board.start and coord != pulled:
+            return "block pushed onto the start portal"
+
+    # counters
+    steps = new_state.moves_taken - state.moves_taken
+    if new_state.objects_moved - state.objects_moved != len(diff.moved) + len(diff.dropped):
+        return "objects moved does not match the diff"
+    if steps not in (0, 1):
+        return "moves taken jumped"
+    if steps != (new_state.player != state.player):
+        return "moves taken does not match the player moving"
+    if steps and new_state.player != (state.player[0] + move_x, state.player[1] + move_y):
+        return "player moved the wrong way"
+    if board.enforce_limits and len(diff.moved) > board.max_moved:
+        return "more blocks moved than max_moved"
+
+    # the diff replays onto the old grid exactly
+    replayed = state.copy()
+    for coord, target in diff.moved + diff.dropped:
+        if replayed.kindAt(*target) != simulation.EMPTY:
+            return f"diff moves {coord} onto occupied {target}"
+        replayed.setBlock(*target, replayed.kindAt(*coord), replayed.directionAt(*coord))
+        replayed.setBlock(*coord, simulation.EMPTY)
+    if replayed.grid != grid or replayed.directions != new_state.directions:
+        return "diff does not match the new grid"
+
+    return None
+
+def checkFull(state):
+
+    # heights are kept up to date move by move, recount them
+    recounted = simulation.GameState(state.board, state.grid[:], state.directions[:], state.player)
+    if recounted.heights != state.heights:
+        return "column heights are out of date"
+
+    # packed states unpack to the same thing
+    if simulation.unpack(state.static(), state.pack(), state.moves_taken, state.objects_moved).key() != state.key():
+        return "pack and unpack disagree"
+
+    return None
+
+def _fail(message, start, moves):
+    return FuzzFailure(message, start, "".join(moves))
+
+def fuzz(seed, boards = 64, moves = 2000, full_every = FULL_CHECK_EVERY):
+
+    # boards play side by side so the batch simulator can be checked on the same moves
+    rng = random.Random(seed)
+    starts = [randomState(rng) for board in range(boards)]
+    states = list(starts)
+    batch = batch_simulation.BatchState(starts)
+    logs = [[] for board in range(boards)]
+    transitions = 0
+
+    for move in range(moves):
+        codes = [rng.randrange(len(solver.MOVE_ORDER)) for board in range(boards)]
+        blocked = batch_simulation.step(batch, np.array(codes))
+
+        for board in range(boards):
+            state = states[board]
+            key = solver.MOVE_ORDER[codes[board]]
+            logs[board].append(key)
+
+            if simulation.isFinished(state):
+                new_state, diff = state, None
+            else:
+                new_state, diff = simulation.stepKey(state, key)
+                transitions += 1
+                message = checkStep(state, key, new_state, diff)
+                if message:
+                    raise _fail(message, starts[board], logs[board])
+
+            if bool(blocked[board]) != (diff is None):
+                raise _fail("batch simulator disagrees on whether the move was blocked", starts[board], logs[board])
+            states[board] = new_state
+
+        if move % full_every == full_every - 1 or move == moves - 1:
+            for board in range(boards):
+                message = checkFull(states[board])
+                if not message and batch.state(board).key() != states[board].key():
+                    message = "batch simulator board differs"
+                if message:
+                    raise _fail(message, starts[board], logs[board])
+
+    return transitions
+
+def _fuzzTask(args):
+    seed, boards, moves = args
+    try:
+        return seed, fuzz(seed, boards, moves), None
+    # the record goes back instead of the exception, which can not be pickled with its extra arguments
+    except FuzzFailure as failure:
+        return seed, 0, failure.record()
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(description = "Play random moves on random boards and check the move rules.")
+    parser.add_argument("--seconds", type = float, default = 60)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--boards", type = int, default = 64)
+    parser.add_argument("--moves", type = int, default = 2000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    transitions = 0
+    failures = 0
+
+    workers = args.workers or os.cpu_count()
+    seed = args.seed
+
+    with multiprocessing.Pool(workers) as pool:
+
+        # one seed per worker at a time, the pool would otherwise queue seeds forever
+        while time.perf_counter() - start < args.seconds:
+            tasks = [(seed + i, args.boards, args.moves) for i in range(workers)]
+            seed += workers
+
+            for task_seed, count, failure in pool.imap_unordered(_fuzzTask, tasks):
+                transitions += count
+
+                # save a repro, the map loads in the game and the moves play it again
+                if failure:
+                    failures += 1
+                    os.makedirs(FAILURE_FOLDER, exist_ok = True)
+                    with open(os.path.join(FAILURE_FOLDER, f"seed {task_seed}.json"), "w") as w:
+                        json.dump(failure, w)
+                    print(f"seed {task_seed}: {failure['error']}")
+
+    seconds = time.perf_counter() - start
+    print(f"{transitions} moves checked in {seconds:.1f}s ({transitions / seconds:.0f}/s), {failures} failures")
\ No newline at end of file
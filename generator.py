@@ -0,0 +1,195 @@
+import collections
+import map_analysis
+import multiprocessing
+import random
+import simulation
+import solver
+
+# moves the solver can try per candidate before it is thrown away
+MAX_EXPANSIONS = 20000
+
+class Candidate:
+    __slots__ = ("map_data", "par", "branching", "score")
+
+    def __init__(self, map_data, par, branching):
+
+        # map in the same format as the map files
+        self.map_data = map_data
+
+        # difficulty
+        self.par = par
+        self.branching = branching
+        self.score = par * branching
+
+def randomLayout(rng, walls, crates, direction_blocks):
+
+    board = simulation.Board((1, 1), (1, 1))
+    state = simulation.GameState(board)
+
+    # board walls
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            if x in (0, simulation.BOARD_SIZE - 1) or y in (0, simulation.BOARD_SIZE - 1):
+                state.setBlock(x, y, 0, simulation.WALL)
+
+    inner = [(x, y) for x in range(1, simulation.BOARD_SIZE - 1) for y in range(1, simulation.BOARD_SIZE - 1)]
+    rng.shuffle(inner)
+
+    # the player starts the reverse play on the end portal
+    board.end = inner.pop()
+    state.player = board.end
+
+    for i in range(walls):
+        state.setBlock(*inner.pop(), 0, simulation.WALL)
+    for i in range(crates):
+        state.setBlock(*inner.pop(), 0, simulation.CRATE)
+    for i in range(direction_blocks):
+        state.setBlock(*inner.pop(), 0, simulation.DIRECTION, rng.choice(simulation.DIRECTION_VECTORS[1:]))
+
+    return state
+
+def _undrop(state, rng):
+
+    # lift the top block of a column onto a neighbouring stack, the reverse of a drop
+    columns = []
+    for x in range(1, simulation.BOARD_SIZE - 1):
+        for y in range(1, simulation.BOARD_SIZE - 1):
+            height = state.heightAt(x, y)
+            if height and state.kindAt(x, y, height - 1) != simulation.WALL:
+                columns.append((x, y, height - 1))
+    if not columns:
+        return
+
+    x, y, level = rng.choice(columns)
+    move_x, move_y = rng.choice(list(simulation.DIRECTIONS.values()))
+    height = state.heightAt(x + move_x, y + move_y)
+    if height < 1 or height >= simulation.LEVELS or state.kindAt(x + move_x, y + move_y) == simulation.WALL:
+        return
+
+    kind, direction = state.kindAt(x, y, level), state.directionAt(x, y, level)
+    state.setBlock(x, y, level, simulation.EMPTY)
+    state.setBlock(x + move_x, y + move_y, height, kind, direction)
+
+def reversePlay(state, rng, steps, undrop_chance):
+
+    # pulls undo pushes and pushes undo pulls, so walking around from the end scrambles the blocks
+    # into a layout that usually still leads back, the solver checks the rest
+    state = state.copy()
+    for i in range(steps):
+        if rng.random() < undrop_chance:
+            _undrop(state, rng)
+        else:
+            state = simulation.stepKey(state, rng.choice(solver.MOVE_ORDER))[0]
+
+    # wherever the player ended up is the start
+    state.board.start = state.player
+    state.moves_taken = 0
+    state.objects_moved = 0
+    return state
+
+def walkingDistance(state):
+
+    # fewest moves from start to end with only the walls in the way
+    distances = {state.board.start: 0}
+    queue = collections.deque([state.board.start])
+    while queue:
+        x, y = queue.popleft()
+        for move_x, move_y in simulation.DIRECTIONS.values():
+            new_position = (x + move_x, y + move_y)
+            if not new_position in distances and state.kindAt(*new_position) != simulation.WALL:
+                distances[new_position] = distances[(x, y)] + 1
+                queue.append(new_position)
+    return distances.get(state.board.end)
+
+def branchingFactor(state, moves):
+
+    # average number of moves to choose from along the solution
+    choices = 0
+    for key in moves:
+        choices += sum(1 for successor in solver.successors(state))
+        state = simulation.stepKey(state, key)[0]
+    return choices / len(moves)
+
+def chainLength(state, moves):
+
+    # most blocks moved by a single move of the solution
+    longest = 0
+    for key in moves:
+        state, diff = simulation.stepKey(state, key)
+        longest = max(longest, len(diff.moved))
+    return longest
+
+def generateOne(seed, min_par = 8, slack = 3, max_expansions = MAX_EXPANSIONS):
+
+    rng = random.Random(seed)
+
+    state = randomLayout(rng, rng.randint(8, 30), rng.randint(3, 10), rng.randint(0, 3))
+    state = reversePlay(state, rng, rng.randint(20, 120), 0.05)
+    if state.board.start == state.board.end:
+        return None
+
+    # most candidates are thrown away, building a pattern database for each costs far more than the capped search
+    result = solver.solve(state, max_expansions = max_expansions, analysis = map_analysis.MapAnalysis(state))
+    if not result.solved or result.par < min_par:
+        return None
+
+    # the blocks have to be in the way, walking straight to the end is not a puzzle
+    if result.par <= walkingDistance(state):
+        return None
+
+    # limits from the par, tightening them cannot make the solution invalid
+    # the run is over once moves taken reaches max_moves, so the par itself needs one more
+    state.board.max_moves = result.par + 1 + slack
+    state.board.max_moved = chainLength(state, result.moves)
+    state.board.map_name = f"Generated {seed}"
+
+    return Candidate(simulation.stateToMapData(state), result.par, branchingFactor(state, result.moves))
+
+def _generateTask(args):
+    return generateOne(*args)
+
+def generate(count, seed = 0, workers = None, min_par = 8, slack = 3, max_expansions = MAX_EXPANSIONS):
+
+    # every seed is one candidate, workers take seeds until enough maps are solvable
+    found = []
+    seen = set()
+    with multiprocessing.Pool(workers) as pool:
+        tasks = ((seed + i, min_par, slack, max_expansions) for i in range(2 ** 62))
+        for candidate in pool.imap_unordered(_generateTask, tasks, chunksize = 4):
+            if candidate is None:
+                continue
+
+            # the same layout can come out of different seeds
+            layout = repr({key: value for key, value in candidate.map_data.items() if key != "map_name"})
+            if layout in seen:
+                continue
+            seen.add(layout)
+
+            found.append(candidate)
+            if len(found) >= count:
+                break
+
+    # hardest first
+    found.sort(key = lambda candidate: -candidate.score)
+    return found
+
+if __name__ == "__main__":
+    import argparse
+    import json
+    import os
+
+    parser = argparse.ArgumentParser(description = "Generate solvable Gravkoban maps.")
+    parser.add_argument("count", type = int)
+    parser.add_argument("--seed", type = int, default = 0)
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--min-par", type = int, default = 8)
+    parser.add_argument("--slack", type = int, default = 3, help = "moves allowed on top of the par")
+    parser.add_argument("--max-expansions", type = int, default = MAX_EXPANSIONS)
+    parser.add_argument("--folder", default = "maps")
+    args = parser.parse_args()
+
+    os.makedirs(args.folder, exist_ok = True)
+    for candidate in generate(args.count, args.seed, args.workers, args.min_par, args.slack, args.max_expansions):
+        with open(os.path.join(args.folder, f"{candidate.map_data['map_name']}.json"), "w") as map_write:
+            map_write.write(json.dumps(candidate.map_data))
+        print(f"{candidate.map_data['map_name']}: par {candidate.par}, branching {candidate.branching:.2f}, score {candidate.score:.1f}")
\ No newline at end of file
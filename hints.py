@@ -0,0 +1,152 @@
+import map_analysis
+import os
+import pattern_database
+import simulation
+import solver
+import struct
+import threading
+
+HINT_FOLDER = "hints"
+
+# record: state hash, move index, moves left to the end
+RECORD = struct.Struct("<QBH")
+
+# move index for states the end cannot be reached from
+NO_MOVE = 255
+
+# a search gives up after this many states instead of holding the game up
+MAX_EXPANSIONS = 50000
+
+class HintCache:
+    def __init__(self, state, analysis = None, folder = HINT_FOLDER, max_expansions = MAX_EXPANSIONS):
+
+        # state hash -> (move, moves left)
+        self.table = {}
+        self.lock = threading.Lock()
+        self.thread = None
+
+        # hashes of states the search gave up on, asking again would give up again
+        self.given_up = set()
+        self.max_expansions = max_expansions
+
+        # blocks stuck for good are never worth searching from
+        self.analysis = analysis or map_analysis.MapAnalysis(state)
+
+        # heuristic for every search on this map, built by the first search so the game does not wait for it
+        self.pdb = None
+
+        self.path = os.path.join(folder, f"{state.board.map_name}.hints") if folder else None
+        self.digest = simulation.mapHash(state)
+
+        if self.path:
+            os.makedirs(folder, exist_ok = True)
+            self._load()
+
+    def _load(self):
+
+        # start over if the map was edited since the hints were saved
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as r:
+            data = r.read()
+        if data[:len(self.digest)] != self.digest:
+            os.remove(self.path)
+            return
+
+        # a partly written record at the end is dropped
+        data = data[len(self.digest):]
+        for h, move, left in RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size]):
+            self.table[h] = (None if move == NO_MOVE else solver.MOVE_ORDER[move], left)
+
+    def _save(self, records):
+
+        if not self.path:
+            return
+
+        new_file = not os.path.exists(self.path)
+        with open(self.path, "ab") as w:
+            if new_file:
+                w.write(self.digest)
+            w.write(b"".join(RECORD.pack(h, NO_MOVE if move is None else solver.MOVE_ORDER.index(move), left) for h, move, left in records))
+
+    def lookup(self, state):
+        h = solver.zobristHash(state)
+        with self.lock:
+            return self.table.get(h)
+
+    def gaveUp(self, state):
+        with self.lock:
+            return solver.zobristHash(state) in self.given_up
+
+    def solution(self, state):
+
+        # cached moves from here to the end, as far as the hints go
+        moves = []
+        h = solver.zobristHash(state)
+        seen = set()
+        while not simulation.isFinished(state) and not h in seen:
+            seen.add(h)
+            with self.lock:
+                hint = self.table.get(h)
+            if hint is None or hint[0] is None:
+                break
+            new_state, diff = simulation.stepKey(state, hint[0])
+            if diff is None:
+                break
+            h = solver.updateHash(h, state, new_state, diff)
+            moves.append(hint[0])
+            state = new_state
+        return "".join(moves)
+
+    @property
+    def searching(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def request(self, state):
+
+        # one search at a time, returns whether this one started
+        if self.searching:
+            return False
+
+        # moves taken only limit the search, the best move does not depend on them
+        state = state.copy()
+        state.moves_taken = 0
+        state.objects_moved = 0
+
+        self.thread = threading.Thread(target = self._search, args = (state,), daemon = True)
+        self.thread.start()
+        return True
+
+    def _search(self, state):
+
+        if self.pdb is None:
+            self.pdb = pattern_database.PatternDatabase(state)
+
+        h = solver.zobristHash(state)
+        result = solver.solve(state, self.pdb.heuristic, self.max_expansions, self.analysis)
+
+        # gave up, the player has to move on before it is worth another try
+        if not result.complete:
+            with self.lock:
+                self.given_up.add(h)
+            return
+
+        records = []
+        if not result.solved:
+            records.append((h, None, 0))
+
+        # every state on the way to the end gets its hint too
+        else:
+            left = result.par
+            for key in result.moves:
+                records.append((h, key, left))
+                new_state, diff = simulation.stepKey(state, key)
+                h = solver.updateHash(h, state, new_state, diff)
+                left -= new_state.moves_taken - state.moves_taken
+                state = new_state
+
+        with self.lock:
+            for h, move, left in records:
+                self.table[h] = (move, left)
+
+        self._save(records)
\ No newline at end of file
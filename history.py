@@ -0,0 +1,80 @@
+import simulation
+import solver
+import struct
+
+# move index, player before and after, stats before the move, moved and dropped counts
+ENTRY = struct.Struct("<B4BIIBB")
+
+# cell indices a block moved from and to, below GRID_SIZE so two bytes each
+PAIR = struct.Struct("<HH")
+
+def packEntry(key, diff, moves_taken, objects_moved):
+
+    # only the cells that changed, never a copy of the board
+    data = bytearray(ENTRY.pack(
+        solver.MOVE_ORDER.index(key),
+        *diff.player_from, *diff.player_to,
+        moves_taken, objects_moved,
+        len(diff.moved), len(diff.dropped),
+    ))
+    for coord, target in diff.moved + diff.dropped:
+        data += PAIR.pack(simulation.index(*coord), simulation.index(*target))
+    return bytes(data)
+
+def unpackEntry(data):
+
+    # (key, diff, moves taken before, objects moved before)
+    move, from_x, from_y, to_x, to_y, moves_taken, objects_moved, moved_count, dropped_count = ENTRY.unpack_from(data)
+    pairs = [
+        (simulation.coordinate(source), simulation.coordinate(target))
+        for source, target in PAIR.iter_unpack(data[ENTRY.size:])
+    ]
+    diff = simulation.MoveDiff(pairs[:moved_count], pairs[moved_count:], (from_x, from_y), (to_x, to_y))
+    return solver.MOVE_ORDER[move], diff, moves_taken, objects_moved
+
+def revertDiff(diff):
+
+    # the moves that put every block back, last change first
+    return [(target, coord) for coord, target in reversed(diff.moved + diff.dropped)]
+
+class MoveHistory:
+    def __init__(self):
+
+        # packed entries, a few dozen bytes per move
+        self.done = []
+        self.undone = []
+
+    def __len__(self):
+        return len(self.done)
+
+    def push(self, key, diff, moves_taken, objects_moved):
+
+        # a new move throws away everything that could have been redone
+        self.done.append(packEntry(key, diff, moves_taken, objects_moved))
+        self.undone.clear()
+
+    def undo(self):
+
+        if not self.done:
+            return None
+        entry = self.done.pop()
+        self.undone.append(entry)
+        return unpackEntry(entry)
+
+    def redo(self):
+
+        if not self.undone:
+            return None
+        entry = self.undone.pop()
+        self.done.append(entry)
+        return unpackEntry(entry)
+
+    def shift(self, count):
+
+        # jump over several moves without unpacking them, negative counts go back
+        while count > 0 and self.undone:
+            self.done.append(self.undone.pop())
+            count -= 1
+        while count < 0 and self.done:
+            self.undone.append(self.done.pop())
+            count += 1
\ No newline at end of file
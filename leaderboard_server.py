@@ -0,0 +1,266 @@
+import asyncio
+import concurrent.futures
+import glob
+import io
+import json
+import multiprocessing
+import os
+import replay
+import simulation
+import urllib.parse
+
+# same layout as highscores/highscores.json, map name -> fewest moves taken
+LEADERBOARD_FILE = "highscores/leaderboard.json"
+
+# biggest replay accepted, about 2.5 million moves
+MAX_UPLOAD = 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+def loadMaps(folder = "maps"):
+
+    # replays name their map by hash, so index every map by it
+    maps = {}
+    for file in glob.glob(os.path.join(folder, "*.json")):
+        with open(file, "r") as r:
+            map_data = json.load(r)
+        maps[simulation.mapHash(simulation.stateFromMapData(map_data))] = map_data
+    return maps
+
+def verify(data, map_data):
+
+    # runs in a worker process, returns (moves taken, objects moved) or raises ReplayMismatch
+    reader = replay.ReplayReader(io.BytesIO(data))
+    if reader.count == replay.UNFINISHED:
+        raise replay.ReplayMismatch("replay was never finished")
+
+    state = simulation.stateFromMapData(map_data)
+    if reader.map_hash != simulation.mapHash(state):
+        raise replay.ReplayMismatch("replay was recorded on a different map")
+
+    # every move the same way the game does it, a finished run has no moves after the end
+    played = 0
+    for key in reader.moves():
+        if simulation.isFinished(state):
+            raise replay.ReplayMismatch("moves after the run ended")
+        state = simulation.stepKey(state, key)[0]
+        played += 1
+
+    if played != reader.count:
+        raise replay.ReplayMismatch("replay is cut short")
+    if not simulation.isSolved(state):
+        raise replay.ReplayMismatch("replay does not reach the end")
+
+    return state.moves_taken, state.objects_moved
+
+# maps of a worker process, sent once when the worker starts instead of with every replay
+_worker_maps = {}
+
+def _initWorker(maps):
+    _worker_maps.update(maps)
+
+def _verifyTask(data, map_hash):
+    return verify(data, _worker_maps[map_hash])
+
+class LeaderboardServer:
+    def __init__(self, maps, leaderboard_file = LEADERBOARD_FILE, workers = None, queue_size = 256):
+
+        self.maps = maps
+        self.leaderboard_file = leaderboard_file
+
+        # verified highscores, written back a few times a second instead of once per submission
+        self.highscores = {}
+        if os.path.exists(leaderboard_file):
+            with open(leaderboard_file, "r") as r:
+                self.highscores = json.load(r)
+        self.dirty = False
+
+        # submissions wait here for a worker, a full queue turns new ones away
+        self.queue = asyncio.Queue(queue_size)
+        self.workers = workers or os.cpu_count()
+        self.pool = self._newPool()
+        self.tasks = []
+
+        # stats
+        self.verified = 0
+        self.rejected = 0
+
+    def _newPool(self):
+
+        # spawned, forked workers would keep copies of open client sockets and hold connections open
+        return concurrent.futures.ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"), _initWorker, (self.maps,))
+
+    async def start(self, host = "127.0.0.1", port = 8765):
+
+        self.tasks = [asyncio.create_task(self._verifier()) for worker in range(self.workers * 2)]
+        self.tasks.append(asyncio.create_task(self._flusher()))
+        self.server = await asyncio.start_server(self._handle, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self.tasks:
+            task.cancel()
+        self.flush()
+        self.pool.shutdown()
+
+    def flush(self):
+
+        if not self.dirty:
+            return
+
+        # write a copy then swap it in so a crash never leaves half a file
+        os.makedirs(os.path.dirname(self.leaderboard_file) or ".", exist_ok = True)
+        with open(self.leaderboard_file + ".tmp", "w") as w:
+            json.dump(self.highscores, w)
+        os.replace(self.leaderboard_file + ".tmp", self.leaderboard_file)
+        self.dirty = False
+
+    async def _flusher(self):
+        while True:
+            await asyncio.sleep(0.5)
+            self.flush()
+
+    async def _verifier(self):
+
+        loop = asyncio.get_running_loop()
+        while True:
+            data, map_hash, future = await self.queue.get()
+            map_data = self.maps[map_hash]
+            pool = self.pool
+            try:
+                result = await loop.run_in_executor(pool, _verifyTask, data, map_hash)
+            except (replay.ReplayMismatch, ValueError) as error:
+                self.rejected += 1
+                response = (422, {"verified": False, "error": str(error)})
+
+            # a broken pool or anything else unexpected fails this submission, never the verifier
+            except Exception as error:
+                response = (500, {"verified": False, "error": f"verification failed: {error!r}"})
+
+                # a worker died and took the pool with it, the first verifier to notice starts a new one
+                if isinstance(error, concurrent.futures.process.BrokenProcessPool) and pool is self.pool:
+                    self.pool = self._newPool()
+                    pool.shutdown(wait = False)
+            else:
+                self.verified += 1
+                response = (200, self.record(map_data["map_name"], *result))
+            finally:
+                self.queue.task_done()
+
+            # the client may have gone away and cancelled it
+            if not future.done():
+                future.set_result(response)
+
+    def record(self, map_name, moves_taken, objects_moved):
+
+        # same rule as endGame, only fewer moves replace a highscore
+        highscore = not map_name in self.highscores or self.highscores[map_name] > moves_taken
+        if highscore:
+            self.highscores[map_name] = moves_taken
+            self.dirty = True
+
+        return {"verified": True, "map_name": map_name, "moves_taken": moves_taken, "objects_moved": objects_moved, "highscore": highscore}
+
+    async def submit(self, data):
+
+        try:
+            header = replay.HEADER.unpack_from(data)
+        except Exception:
+            return 400, {"error": "not a replay"}
+
+        if not header[2] in self.maps:
+            return 404, {"error": "unknown map"}
+
+        # back-pressure, the client should try again later instead of piling up work
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((data, header[2], future))
+        except asyncio.QueueFull:
+            return 503, {"error": "too many submissions, try again later"}
+
+        return await future
+
+    async def _handle(self, reader, writer):
+
+        try:
+            request_line = await reader.readline()
+            method, target, version = request_line.decode("latin-1").split()
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, value = line.decode("latin-1").split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+            path = urllib.parse.urlsplit(target).path
+            length = int(headers.get("content-length", 0))
+
+            if path == "/highscores" and method == "GET":
+                status, body = 200, self.highscores
+            elif path == "/submit" and method == "POST":
+                if length > MAX_UPLOAD:
+                    status, body = 413, {"error": "replay too big"}
+                else:
+                    status, body = await self.submit(await reader.readexactly(length))
+            elif path in ("/highscores", "/submit"):
+                status, body = 405, {"error": "method not allowed"}
+            else:
+                status, body = 404, {"error": "not found"}
+
+        except (ValueError, asyncio.IncompleteReadError):
+            status, body = 400, {"error": "bad request"}
+
+        data = json.dumps(body).encode()
+        headers = [
+            f"HTTP/1.1 {status} {STATUS_TEXT[status]}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(data)}",
+            "Connection: close",
+        ]
+        if status == 503:
+            headers.append("Retry-After: 1")
+
+        writer.write(("\r\n".join(headers) + "\r\n\r\n").encode() + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+async def serve(host, port, workers, queue_size, leaderboard_file):
+
+    server = LeaderboardServer(loadMaps(), leaderboard_file, workers, queue_size)
+    port = await server.start(host, port)
+    print(f"Verifying replays on http://{host}:{port}/submit, {len(server.maps)} maps loaded")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Verify uploaded replays and keep a leaderboard of the real ones.")
+    parser.add_argument("--host", default = "127.0.0.1")
+    parser.add_argument("--port", type = int, default = 8765)
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--queue-size", type = int, default = 256)
+    parser.add_argument("--leaderboard", default = LEADERBOARD_FILE)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, args.queue_size, args.leaderboard))
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,113 @@
+import simulation
+
+COLUMNS = simulation.BOARD_SIZE * simulation.BOARD_SIZE
+
+# crates, then one entry per direction block direction, same order as the direction plane
+PATTERNS = (None, *simulation.DIRECTION_VECTORS[1:])
+
+def bit(x, y):
+    return 1 << simulation.column(x, y)
+
+def hasBit(mask, x, y):
+    return mask >> simulation.column(x, y) & 1
+
+class MapAnalysis:
+    def __init__(self, state):
+
+        board = state.board
+        self.board = board
+
+        # walls never move, everything else only counts for the moment
+        self.walls = 0
+        for x in range(simulation.BOARD_SIZE):
+            for y in range(simulation.BOARD_SIZE):
+                if state.kindAt(x, y) == simulation.WALL:
+                    self.walls |= bit(x, y)
+
+        # cells a block can never be pushed into, a pulled block can still land on the start the player stepped off
+        self.pull_barriers = self.walls | bit(*board.end)
+        self.barriers = self.pull_barriers
+        if board.block_start:
+            self.barriers |= bit(*board.start)
+
+        # cells where a block of each pattern can never move again
+        frozen = board.enforce_limits and board.max_moved < 1
+        self.dead = [self._deadCells(direction, frozen) for direction in PATTERNS]
+
+        # for every cell, the cells still connected to the end if that cell is blocked for good
+        self.end_side = [self._connected(board.end, 1 << column) for column in range(COLUMNS)]
+
+    def _free(self, x, y, mask):
+        return 0 <= x < simulation.BOARD_SIZE and 0 <= y < simulation.BOARD_SIZE and not hasBit(mask, x, y)
+
+    def canMove(self, x, y, move_x, move_y):
+
+        # push, something stands behind and the cell in front takes the block
+        if self._free(x - move_x, y - move_y, self.walls) and self._free(x + move_x, y + move_y, self.barriers):
+            return True
+
+        # pull, the player stands in front and steps one further
+        return self._free(x + move_x, y + move_y, self.pull_barriers) and self._free(x + 2 * move_x, y + 2 * move_y, self.walls)
+
+    def _deadCells(self, direction, frozen):
+
+        dead = 0
+        for x in range(simulation.BOARD_SIZE):
+            for y in range(simulation.BOARD_SIZE):
+                if hasBit(self.walls, x, y):
+                    continue
+                moves = [direction] if direction else simulation.DIRECTIONS.values()
+                if frozen or not any(self.canMove(x, y, *move) for move in moves):
+                    dead |= bit(x, y)
+        return dead
+
+    def _connected(self, origin, blocked):
+
+        # flood fill over the board without walls and blocked cells
+        if hasBit(self.walls | blocked, *origin):
+            return 0
+
+        reached = bit(*origin)
+        stack = [origin]
+        while stack:
+            x, y = stack.pop()
+            for move_x, move_y in simulation.DIRECTIONS.values():
+                new_x, new_y = x + move_x, y + move_y
+                if self._free(new_x, new_y, self.walls | blocked | reached):
+                    reached |= bit(new_x, new_y)
+                    stack.append((new_x, new_y))
+        return reached
+
+    def isDead(self, x, y, direction = None):
+        return hasBit(self.dead[simulation.DIRECTION_CODES[tuple(direction)] if direction else 0], x, y)
+
+    def blocksEnd(self, player, x, y, direction = None):
+
+        # a block stuck here for good cuts the player off from the end
+        return self.isDead(x, y, direction) and not hasBit(self.end_side[simulation.column(x, y)], *player)
+
+    def isDoomedMove(self, state, diff):
+
+        # only blocks that just landed on the ground can have made the map unwinnable
+        for coord, target in diff.moved + diff.dropped:
+            if target[2] == 0 and self.blocksEnd(state.player, target[0], target[1], state.directionAt(*target)):
+                return True
+        return False
+
+    def warnings(self, state):
+
+        board = state.board
+        messages = []
+
+        if not hasBit(self._connected(board.end, 0), *board.start):
+            messages.append("End can't be reached from start!")
+
+        for position, kind, direction in state.blocks():
+            if kind == simulation.WALL or position[2] > 0:
+                continue
+            if self.blocksEnd(board.start, position[0], position[1], direction):
+                messages.append(f"Block at {position[:2]} can never move and blocks the end!")
+            elif kind == simulation.DIRECTION and self.isDead(position[0], position[1], direction):
+                messages.append(f"Direction block at {position[:2]} can never move!")
+
+        return messages
\ No newline at end of file
@@ -1,170 +1,306 @@
-import blocks
-import json
-from ursina import *
-
-def loadMap(file):
-
-    # board coordinates and walls
-    wall_coordinates = [
-        *[(0, y) for y in range(11 + 1)],
-        *[(11, y) for y in range(11 + 1)],
-        *[(x, 0,) for x in range(11 + 1)],
-        *[(x, 11) for x in range(11 + 1)],
-    ]
-    board = {(x, y, 0): (blocks.NullBlock(x, y) if not (x, y) in wall_coordinates else blocks.WallBlock(x, y, True)) for x in range(11 + 1) for y in range(11 + 1)}
-
-    if not file:
-        return board
-
-    # parse map json
-    with open(file, "r") as r:
-        map_data = json.load(r)
-
-    # walls
-    for position in map_data["WallBlock"]:
-        board[tuple(position) + (0, )] = blocks.WallBlock(*position)
-
-    # crate blocks
-    for position in map_data["CrateBlock"]:
-        board[tuple(position)] = blocks.CrateBlock(*position)
-
-    # direction blocks
-    for position in map_data["DirectionBlock"]:
-        board[tuple(position[:3])] = blocks.DirectionBlock(*position)
-
-    # movement restrictions
-    board["max_moves"] = map_data["max_moves"]
-    board["max_moved"] = map_data["max_moved"]
-    
-    # start and end
-    board["start"] = [tuple(map_data["start"]), blocks.PortalBlock(*map_data["start"], color.green)]
-    board["end"] = [tuple(map_data["end"]), blocks.PortalBlock(*map_data["end"], color.red)]
-
-    # data
-    board["map_name"] = map_data["map_name"]
-
-    return board
-
-def boardToJson(board):
-
-    map_data = {
-        "WallBlock": [], "CrateBlock": [], "DirectionBlock": [],
-        "max_moves": 1000, "max_moved": 1000,
-        "start": (1, 1),
-        "end": (10, 10),
-        "map_name": "Untitled Map",
-    }
-
-    type_strings = {
-        blocks.WallBlock: "WallBlock",
-        blocks.CrateBlock: "CrateBlock",
-        blocks.DirectionBlock: "DirectionBlock",
-        blocks.CustomBlock: None,
-    }
-
-    for key, block in board.items():
-
-        if isinstance(block, blocks.NullBlock):
-            continue
-        
-        is_block = False
-        for block_class, type_string in type_strings.items():
-            if isinstance(block, block_class):
-                if type_string:
-                    map_data[type_string].append(block.getJsonData()) # store position
-                is_block = True
-
-        if is_block:
-            continue
-
-        if key in ("max_moves", "max_moved", "map_name"):
-            map_data[key] = block
-
-        else: # portal
-            block = block[1]
-            map_data[key] = (block.x, block.y)
-
-    return json.dumps(map_data)
-
-def selectBlock(board, block_entity):
-
-    # replace block in board if exists
-    if (block_entity.x, block_entity.y, block_entity.level) in board:
-        board[(block_entity.x, block_entity.y, block_entity.level)] = blocks.NullBlock(block_entity.x, block_entity.y)
-
-def editBlock(block, direction):
-
-    # hacky stuff to get around having to be a yandere dev
-    boundary_checks = {
-        "w": [block.y > 1, -1, "y"],
-        "a": [block.x > 1, -1, "x"],
-        "s": [block.y < 10, 1, "y"],
-        "d": [block.x < 10, 1, "x"],
-        "e": [block.level < 6, 1, "level"],
-        "q": [block.level > 0, -1, "level"],
-    }
-    checked = boundary_checks[direction]
-    if checked[0]:
-        setattr(
-            block,
-            checked[2],
-            (getattr(block, checked[2]) + checked[1]) * int(not (isinstance(block, (blocks.WallBlock, blocks.PortalBlock)) and direction in ("q", "e")))
-        )
-
-    # reload block
-    block.entity.position = ((block.x - 6) * 10 + 5, block.level * 10, (-block.y + 5) * 10 + 5)
-
-def canPlaceBlock(board, block):
-
-    block_pos = (block.x, block.y, block.level)
-
-    # block overlaps?
-    if block_pos in board and not isinstance(board[block_pos], blocks.NullBlock):
-        return False
-
-    # block floating?
-    for level in range(block_pos[2]):
-        if not (block.x, block.y, level) in board or isinstance(board[(block.x, block.y, level)], blocks.NullBlock):
-            return False
-
-    # block intersects with start/end?
-    if ("start" in board and board["start"][0] + (0,) == (block.x, block.y, block.level)) or ("end" in board and board["end"][0] + (0,) == (block.x, block.y, block.level)):
-        return False
-    
-    return True
-
-def deleteSelected(board, selected_block):
-
-    if selected_block is None:
-        return None
-    
-    # check if was saved
-    if (selected_block.x, selected_block.y, selected_block.level) in board:
-        del board[(selected_block.x, selected_block.y, selected_block.level)]
-
-    # check if is portalblock
-    if isinstance(selected_block, blocks.PortalBlock) and selected_block._for in board:
-        del board[selected_block._for]
-
-    destroy(selected_block.entity)
-
-    return None
-
-def cancelSelected(board, selected_block, block_last):
-
-    # if has position history then reset it
-    if not block_last is None:
-        selected_block.x, selected_block.y, selected_block.level = block_last
-
-        # reload block
-        selected_block.entity.position = ((selected_block.x - 6) * 10 + 5, selected_block.level * 10, (-selected_block.y + 5) * 10 + 5)
-
-        # save block
-        board[(selected_block.x, selected_block.y, selected_block.level)] = selected_block
-
-        block_last = None
-
-    else:
-        destroy(selected_block.entity)
-
+import blocks
+import json
+import simulation
+from ursina import *
+
+def loadMap(file):
+
+    # parse map json
+    map_data = None
+    if file:
+        with open(file, "r") as r:
+            map_data = json.load(r)
+
+    # walls from the map replace the default board walls
+    map_walls = {tuple(position) for position in map_data["WallBlock"]} if map_data else set()
+
+    # board coordinates and walls
+    board = {}
+    for x in range(11 + 1):
+        for y in range(11 + 1):
+            if (x, y) in map_walls:
+                board[(x, y, 0)] = blocks.WallBlock(x, y)
+            elif x in (0, 11) or y in (0, 11):
+                board[(x, y, 0)] = blocks.WallBlock(x, y, True)
+            else:
+                board[(x, y, 0)] = blocks.NULL_BLOCK
+
+    if not map_data:
+        indexColumns(board)
+        return board
+
+    # crate blocks
+    for position in map_data["CrateBlock"]:
+        board[tuple(position)] = blocks.CrateBlock(*position)
+
+    # direction blocks
+    for position in map_data["DirectionBlock"]:
+        board[tuple(position[:3])] = blocks.DirectionBlock(*position)
+
+    # movement restrictions
+    board["max_moves"] = map_data["max_moves"]
+    board["max_moved"] = map_data["max_moved"]
+    
+    # start and end
+    board["start"] = [tuple(map_data["start"]), blocks.PortalBlock(*map_data["start"], color.green)]
+    board["end"] = [tuple(map_data["end"]), blocks.PortalBlock(*map_data["end"], color.red)]
+
+    # data
+    board["map_name"] = map_data["map_name"]
+
+    indexColumns(board)
+
+    return board
+
+def _occupied(board, key):
+    return key in board and not isinstance(board[key], blocks.NullBlock)
+
+def updateColumn(board, x, y):
+
+    # count blocks from the ground up until the first gap
+    height = 0
+    while height < simulation.LEVELS and _occupied(board, (x, y, height)):
+        height += 1
+    board["heights"][simulation.column(x, y)] = height
+
+def indexColumns(board):
+
+    # support height of every column, kept up to date by moveBlock and the editor
+    board["heights"] = bytearray(simulation.BOARD_SIZE * simulation.BOARD_SIZE)
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            updateColumn(board, x, y)
+
+def columnHeight(board, x, y):
+    return board["heights"][simulation.column(x, y)]
+
+def clearBoard(board):
+
+    # clear board and entities
+    for key, block in board.items():
+        if hasattr(block, "entity"):
+            destroy(block.entity)
+        elif key in ("start", "end", "mapping"): # portal
+            block[1].removed = True
+            destroy(block[1].entity)
+    board.clear()
+
+def boardToJson(board):
+
+    map_data = {
+        "WallBlock": [], "CrateBlock": [], "DirectionBlock": [],
+        "max_moves": 1000, "max_moved": 1000,
+        "start": (1, 1),
+        "end": (10, 10),
+        "map_name": "Untitled Map",
+    }
+
+    type_strings = {
+        blocks.WallBlock: "WallBlock",
+        blocks.CrateBlock: "CrateBlock",
+        blocks.DirectionBlock: "DirectionBlock",
+        blocks.CustomBlock: None,
+    }
+
+    for key, block in board.items():
+
+        if isinstance(block, blocks.NullBlock):
+            continue
+        
+        is_block = False
+        for block_class, type_string in type_strings.items():
+            if isinstance(block, block_class):
+                if type_string:
+                    map_data[type_string].append(block.getJsonData()) # store position
+                is_block = True
+
+        if is_block:
+            continue
+
+        if key == "heights":
+            continue
+
+        if key in ("max_moves", "max_moved", "map_name"):
+            map_data[key] = block
+
+        else: # portal
+            block = block[1]
+            map_data[key] = (block.x, block.y)
+
+    return json.dumps(map_data)
+
+def boardToState(board, player, moves_taken = 0, objects_moved = 0, block_start = True, enforce_limits = True):
+
+    state_board = simulation.Board(
+        board["start"][0],
+        board["end"][0],
+        board.get("max_moves", 1000),
+        board.get("max_moved", 1000),
+        board.get("map_name", "Untitled Map"),
+        block_start,
+        enforce_limits,
+    )
+    state = simulation.GameState(state_board, player = player, moves_taken = moves_taken, objects_moved = objects_moved)
+
+    for key, block in board.items():
+
+        if not isinstance(key, tuple) or isinstance(block, blocks.NullBlock):
+            continue
+
+        # custom blocks (menu map block) behave like crates
+        if isinstance(block, blocks.WallBlock):
+            state.setBlock(*key, simulation.WALL)
+        elif isinstance(block, blocks.DirectionBlock):
+            state.setBlock(*key, simulation.DIRECTION, block.direction)
+        else:
+            state.setBlock(*key, simulation.CRATE)
+
+    return state
+
+def stateToBoard(state):
+
+    # empty cells and board walls
+    board = {}
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            if state.kindAt(x, y) == simulation.EMPTY:
+                board[(x, y, 0)] = blocks.NULL_BLOCK
+
+    for position, kind, direction in state.blocks():
+        x, y, level = position
+        if kind == simulation.WALL:
+            board[position] = blocks.WallBlock(x, y, x in (0, simulation.BOARD_SIZE - 1) or y in (0, simulation.BOARD_SIZE - 1))
+        elif kind == simulation.DIRECTION:
+            board[position] = blocks.DirectionBlock(x, y, level, direction)
+        else:
+            board[position] = blocks.CrateBlock(x, y, level)
+
+    # movement restrictions
+    board["max_moves"] = state.board.max_moves
+    board["max_moved"] = state.board.max_moved
+
+    # start and end
+    board["start"] = [state.board.start, blocks.PortalBlock(*state.board.start, color.green)]
+    board["end"] = [state.board.end, blocks.PortalBlock(*state.board.end, color.red)]
+
+    # data
+    board["map_name"] = state.board.map_name
+
+    indexColumns(board)
+
+    return board
+
+def syncBoard(board, state):
+
+    # cells that differ, the blocks leaving them fill the cells that need a block that looks the same
+    current = boardToState(board, state.player)
+    changed = [
+        i for i in range(simulation.GRID_SIZE)
+        if current.grid[i] != state.grid[i] or current.directions[i] != state.directions[i]
+    ]
+
+    spare = {}
+    for i in changed:
+        if current.grid[i]:
+            coordinate = simulation.coordinate(i)
+            spare.setdefault((current.grid[i], current.directions[i]), []).append(board[coordinate])
+            if coordinate[2] == 0:
+                board[coordinate] = blocks.NULL_BLOCK
+            else:
+                del board[coordinate]
+
+    # entities jump straight there, nothing is animated
+    for i in changed:
+        if state.grid[i]:
+            x, y, level = coordinate = simulation.coordinate(i)
+            block = spare[(state.grid[i], state.directions[i])].pop()
+            block.x, block.y, block.level = coordinate
+            block.entity.position = ((x - 6) * 10 + 5, level * 10, (-y + 5) * 10 + 5)
+            board[coordinate] = block
+
+    indexColumns(board)
+
+def selectBlock(board, block_entity):
+
+    # replace block in board if exists
+    if (block_entity.x, block_entity.y, block_entity.level) in board:
+        board[(block_entity.x, block_entity.y, block_entity.level)] = blocks.NULL_BLOCK
+        updateColumn(board, block_entity.x, block_entity.y)
+
+def editBlock(block, direction):
+
+    # hacky stuff to get around having to be a yandere dev
+    boundary_checks = {
+        "w": [block.y > 1, -1, "y"],
+        "a": [block.x > 1, -1, "x"],
+        "s": [block.y < 10, 1, "y"],
+        "d": [block.x < 10, 1, "x"],
+        "e": [block.level < 6, 1, "level"],
+        "q": [block.level > 0, -1, "level"],
+    }
+    checked = boundary_checks[direction]
+    if checked[0]:
+        setattr(
+            block,
+            checked[2],
+            (getattr(block, checked[2]) + checked[1]) * int(not (isinstance(block, (blocks.WallBlock, blocks.PortalBlock)) and direction in ("q", "e")))
+        )
+
+    # reload block
+    block.entity.position = ((block.x - 6) * 10 + 5, block.level * 10, (-block.y + 5) * 10 + 5)
+
+def canPlaceBlock(board, block):
+
+    block_pos = (block.x, block.y, block.level)
+
+    # block overlaps?
+    if block_pos in board and not isinstance(board[block_pos], blocks.NullBlock):
+        return False
+
+    # block floating?
+    if columnHeight(board, block.x, block.y) < block.level:
+        return False
+
+    # block intersects with start/end?
+    if ("start" in board and board["start"][0] + (0,) == (block.x, block.y, block.level)) or ("end" in board and board["end"][0] + (0,) == (block.x, block.y, block.level)):
+        return False
+    
+    return True
+
+def deleteSelected(board, selected_block):
+
+    if selected_block is None:
+        return None
+    
+    # check if was saved
+    if (selected_block.x, selected_block.y, selected_block.level) in board:
+        del board[(selected_block.x, selected_block.y, selected_block.level)]
+        updateColumn(board, selected_block.x, selected_block.y)
+
+    # check if is portalblock
+    if isinstance(selected_block, blocks.PortalBlock) and selected_block._for in board:
+        del board[selected_block._for]
+
+    destroy(selected_block.entity)
+
+    return None
+
+def cancelSelected(board, selected_block, block_last):
+
+    # if has position history then reset it
+    if not block_last is None:
+        selected_block.x, selected_block.y, selected_block.level = block_last
+
+        # reload block
+        selected_block.entity.position = ((selected_block.x - 6) * 10 + 5, selected_block.level * 10, (-selected_block.y + 5) * 10 + 5)
+
+        # save block
+        board[(selected_block.x, selected_block.y, selected_block.level)] = selected_block
+        updateColumn(board, selected_block.x, selected_block.y)
+
+        block_last = None
+
+    else:
+        destroy(selected_block.entity)
+
     return None
\ No newline at end of file
@@ -0,0 +1,234 @@
+import multiprocessing
+import os
+import simulation
+import solver
+import struct
+from multiprocessing import shared_memory
+
+# record header: hash, parent hash, key index, flags, moves taken, packed length
+RECORD = struct.Struct("<QQBBHH")
+
+# record flags
+GOAL = 1
+DEAD = 2
+
+# biggest possible record, every cell movable
+MAX_RECORD = RECORD.size + 2 + 4 * simulation.GRID_SIZE
+
+class _Partition:
+    def __init__(self, worker_id, workers, state, outbox_name):
+
+        self.worker_id = worker_id
+        self.workers = workers
+        self.static = state.static()
+
+        # states this worker owns, hash -> (moves taken, parent hash, key)
+        self.seen = {}
+
+        # packed states waiting to be expanded, moves taken -> [(hash, packed)]
+        self.frontier = {}
+        self.goal = None
+
+        # shared memory
+        self.outbox = shared_memory.SharedMemory(name = outbox_name)
+        self.inboxes = {}
+
+    def pending(self):
+        layers = [layer for layer, states in self.frontier.items() if states]
+        return min(layers) if layers else None
+
+    def add(self, h, parent, key, flags, g, packed):
+
+        # already reached with fewer moves
+        if h in self.seen and self.seen[h][0] <= g:
+            return
+
+        self.seen[h] = (g, parent, key)
+
+        if flags & GOAL:
+            if self.goal is None or g < self.goal[0]:
+                self.goal = (g, h)
+        elif not flags & DEAD:
+            self.frontier.setdefault(g, []).append((h, packed))
+
+    def expand(self, layer, budget):
+
+        # successors are grouped per owner so each owner reads one slice
+        buffers = [bytearray() for worker in range(self.workers)]
+        capacity = self.outbox.size - MAX_RECORD * len(solver.MOVE_ORDER)
+        states = self.frontier.get(layer, [])
+        written = 0
+        expanded = 0
+
+        while states and written < capacity and expanded < budget:
+            h, packed = states.pop()
+
+            # skip states that were reached with fewer moves after being queued
+            if self.seen[h][0] < layer:
+                continue
+
+            state = simulation.unpack(self.static, packed, layer)
+            expanded += 1
+
+            for key, new_state, diff in solver.successors(state):
+                new_hash = solver.updateHash(h, state, new_state, diff)
+                flags = (GOAL if simulation.isSolved(new_state) else 0) | (DEAD if simulation.isFinished(new_state) else 0)
+                new_packed = new_state.pack()
+                record = RECORD.pack(new_hash, h, solver.MOVE_ORDER.index(key), flags, new_state.moves_taken, len(new_packed)) + new_packed
+                buffers[new_hash % self.workers] += record
+                written += len(record)
+
+        # copy into the outbox back to back, owners get (start, end) offsets
+        offsets = [0]
+        for buffer in buffers:
+            start = offsets[-1]
+            self.outbox.buf[start:start + len(buffer)] = buffer
+            offsets.append(start + len(buffer))
+
+        return offsets, expanded
+
+    def absorb(self, slices):
+
+        for name, start, end in slices:
+            # workers share the coordinator's resource tracker, so only the coordinator unlinks
+            if not name in self.inboxes:
+                self.inboxes[name] = shared_memory.SharedMemory(name = name)
+
+            data = self.inboxes[name].buf
+            offset = start
+            while offset < end:
+                h, parent, key, flags, g, length = RECORD.unpack_from(data, offset)
+                offset += RECORD.size
+                self.add(h, parent, solver.MOVE_ORDER[key], flags, g, bytes(data[offset:offset + length]))
+                offset += length
+
+    def close(self):
+        for segment in self.inboxes.values():
+            segment.close()
+        self.outbox.close()
+
+def _worker(worker_id, workers, state, outbox_name, connection):
+
+    partition = _Partition(worker_id, workers, state, outbox_name)
+
+    while True:
+        command, *args = connection.recv()
+
+        if command == "seed":
+            partition.add(*args)
+            connection.send(None)
+
+        elif command == "expand":
+            connection.send(partition.expand(*args))
+
+        elif command == "absorb":
+            partition.absorb(*args)
+            connection.send((partition.pending(), partition.goal))
+
+        elif command == "parent":
+            g, parent, key = partition.seen[args[0]]
+            connection.send((parent, key))
+
+        elif command == "stop":
+            partition.close()
+            connection.send(None)
+            return
+
+def solveParallel(state, workers = None, max_expansions = None, segment_size = 16 * 1024 * 1024, chunk = 4096):
+
+    workers = workers or os.cpu_count()
+    start_moves = state.moves_taken
+    start_hash = solver.zobristHash(state)
+
+    # one outbox per worker, every other worker reads its slice straight from it
+    outboxes = [shared_memory.SharedMemory(create = True, size = segment_size) for worker in range(workers)]
+    connections = []
+    processes = []
+    for worker_id in range(workers):
+        parent_end, child_end = multiprocessing.Pipe()
+        process = multiprocessing.Process(target = _worker, args = (worker_id, workers, state, outboxes[worker_id].name, child_end), daemon = True)
+        process.start()
+        connections.append(parent_end)
+        processes.append(process)
+
+    def broadcast(messages):
+        for connection, message in zip(connections, messages):
+            connection.send(message)
+        return [connection.recv() for connection in connections]
+
+    try:
+        flags = (GOAL if simulation.isSolved(state) else 0) | (DEAD if simulation.isFinished(state) else 0)
+        owner = connections[start_hash % workers]
+        owner.send(("seed", start_hash, None, None, flags, state.moves_taken, state.pack()))
+        owner.recv()
+
+        goal = (state.moves_taken, start_hash) if flags & GOAL else None
+        layer = None if flags else state.moves_taken
+        expanded = 0
+
+        while layer is not None:
+
+            # every state with fewer moves is expanded, nothing found later can beat this goal
+            if goal is not None and goal[0] <= layer:
+                break
+
+            if max_expansions is not None and expanded >= max_expansions:
+                return solver.SearchResult(None, None, expanded, False)
+
+            # expand this layer, outboxes fill up in parallel
+            results = broadcast([("expand", layer, chunk)] * workers)
+            expanded += sum(count for offsets, count in results)
+
+            # every worker reads the slices addressed to it
+            replies = broadcast([
+                ("absorb", [(outboxes[source].name, results[source][0][worker_id], results[source][0][worker_id + 1]) for source in range(workers)])
+                for worker_id in range(workers)
+            ])
+
+            # lowest layer with work left anywhere, zero cost moves can add to the current one
+            layers = [pending for pending, found in replies if pending is not None]
+            layer = min(layers) if layers else None
+            for pending, found in replies:
+                if found is not None and (goal is None or found[0] < goal[0]):
+                    goal = found
+
+        if goal is None:
+            return solver.SearchResult(None, None, expanded, True)
+
+        # walk parents back through whichever worker owns each state
+        moves = []
+        h = goal[1]
+        while h != start_hash:
+            connections[h % workers].send(("parent", h))
+            h, key = connections[h % workers].recv()
+            moves.append(key)
+
+        return solver.SearchResult("".join(reversed(moves)), goal[0] - start_moves, expanded, True)
+
+    finally:
+        broadcast([("stop",)] * workers)
+        for process in processes:
+            process.join()
+        for outbox in outboxes:
+            outbox.close()
+            outbox.unlink()
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Solve or prove unsolvable Gravkoban maps on every core.")
+    parser.add_argument("maps", nargs = "+")
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--max-expansions", type = int, default = None)
+    args = parser.parse_args()
+
+    for file in args.maps:
+        result = solveParallel(simulation.loadState(file), args.workers, args.max_expansions)
+        name = os.path.splitext(os.path.basename(file))[0]
+
+        if result.solved:
+            print(f"{name}: par {result.par} ({result.moves}), {result.expanded} states expanded")
+        elif result.complete:
+            print(f"{name}: unsolvable, {result.expanded} states expanded")
+        else:
+            print(f"{name}: gave up after {result.expanded} states")
\ No newline at end of file
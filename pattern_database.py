@@ -0,0 +1,135 @@
+import collections
+import hashlib
+import math
+import numpy as np
+import os
+import simulation
+
+# bump when the rules or the table layout change so old caches are ignored
+VERSION = 1
+
+CACHE_FOLDER = "pdb_cache"
+
+# one table per block kind, crates and the four direction blocks
+PATTERNS = (None, *simulation.DIRECTION_VECTORS[1:])
+UNREACHABLE = np.iinfo(np.uint16).max
+
+COLUMNS = simulation.BOARD_SIZE * simulation.BOARD_SIZE
+
+def layoutHash(state):
+
+    # everything that stays the same while playing, blocks are not part of it
+    board = state.board
+    walls = bytes(state.static().grid)
+    layout = repr((VERSION, board.start, board.end, board.block_start, board.enforce_limits and board.max_moved)).encode()
+    return hashlib.sha1(walls + layout).hexdigest()
+
+def _patternTable(static, direction):
+
+    board = static.board
+    end = simulation.column(*board.end)
+    size = COLUMNS * COLUMNS
+
+    # reverse edges of the abstract game, state = player column * COLUMNS + block column
+    reverse = collections.defaultdict(list)
+    goals = []
+    for block in range(COLUMNS):
+        block_x, block_y = divmod(block, simulation.BOARD_SIZE)
+        if static.kindAt(block_x, block_y):
+            continue
+
+        state = static.copy()
+        state.setBlock(block_x, block_y, 0, simulation.DIRECTION if direction else simulation.CRATE, direction)
+
+        for player in range(COLUMNS):
+            player_x, player_y = divmod(player, simulation.BOARD_SIZE)
+            if player == block or static.kindAt(player_x, player_y):
+                continue
+
+            if player == end:
+                goals.append(player * COLUMNS + block)
+                continue
+
+            state.player = (player_x, player_y)
+            for key in "wasdWASD":
+                new_state, diff = simulation.stepKey(state, key)
+                if diff is None:
+                    continue
+
+                new_block = block
+                for coord, target in diff.moved:
+                    new_block = simulation.column(*target[:2])
+                cost = new_state.moves_taken - state.moves_taken
+                reverse[simulation.column(*new_state.player) * COLUMNS + new_block].append((player * COLUMNS + block, cost))
+
+    # 0-1 breadth first search back from every goal
+    table = np.full(size, UNREACHABLE, dtype = np.uint16)
+    queue = collections.deque()
+    for goal in goals:
+        table[goal] = 0
+        queue.append(goal)
+
+    while queue:
+        current = queue.popleft()
+        distance = table[current]
+        for previous, cost in reverse[current]:
+            if distance + cost < table[previous]:
+                table[previous] = distance + cost
+                if cost:
+                    queue.append(previous)
+                else:
+                    queue.appendleft(previous)
+
+    return table.reshape(COLUMNS, COLUMNS)
+
+def _wallDistances(static):
+
+    # fewest player moves to the end with every block gone
+    distances = np.full(COLUMNS, UNREACHABLE, dtype = np.uint16)
+    end = static.board.end
+    distances[simulation.column(*end)] = 0
+    queue = collections.deque([end])
+    while queue:
+        x, y = queue.popleft()
+        for move_x, move_y in simulation.DIRECTIONS.values():
+            new_x, new_y = x + move_x, y + move_y
+            if 0 <= new_x < simulation.BOARD_SIZE and 0 <= new_y < simulation.BOARD_SIZE and static.kindAt(new_x, new_y) != simulation.WALL:
+                if distances[simulation.column(new_x, new_y)] == UNREACHABLE:
+                    distances[simulation.column(new_x, new_y)] = distances[simulation.column(x, y)] + 1
+                    queue.append((new_x, new_y))
+    return distances
+
+class PatternDatabase:
+    def __init__(self, state, cache_folder = CACHE_FOLDER):
+
+        self.key = layoutHash(state)
+        path = os.path.join(cache_folder, f"{self.key}.npz") if cache_folder else None
+
+        if path and os.path.exists(path):
+            with np.load(path) as data:
+                self.tables = data["tables"]
+                self.distances = data["distances"]
+            return
+
+        static = state.static()
+        self.tables = np.stack([_patternTable(static, direction) for direction in PATTERNS])
+        self.distances = _wallDistances(static)
+
+        if path:
+            os.makedirs(cache_folder, exist_ok = True)
+            np.savez_compressed(path, tables = self.tables, distances = self.distances)
+
+    def heuristic(self, state):
+
+        player = simulation.column(*state.player)
+        best = int(self.distances[player])
+
+        # every ground block on its own gives a lower bound, take the tightest
+        grid = state.grid
+        directions = state.directions
+        for block in range(COLUMNS):
+            i = block * simulation.LEVELS
+            if grid[i] == simulation.CRATE or grid[i] == simulation.DIRECTION:
+                best = max(best, int(self.tables[directions[i], player, block]))
+
+        return math.inf if best == UNREACHABLE else best
\ No newline at end of file
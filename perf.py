@@ -0,0 +1,205 @@
+import collections
+import cProfile
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+import traceback
+
+PERF_FOLDER = "perf"
+
+# samples kept per phase, older ones roll out
+WINDOW = 1024
+
+PERCENTILES = (50, 95, 99)
+
+def percentile(ordered, p):
+    return ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+
+class MoveTimer:
+    def __init__(self, window = WINDOW):
+
+        # phase -> latest durations in nanoseconds
+        self.samples = collections.defaultdict(lambda: collections.deque(maxlen = window))
+        self.window = window
+
+        # move being timed
+        self.started = 0
+        self.last = 0
+        self.phases = {}
+
+    def start(self):
+        self.started = self.last = time.perf_counter_ns()
+        self.phases = {}
+
+    def mark(self, phase):
+
+        # time since the last mark goes to this phase
+        now = time.perf_counter_ns()
+        self.phases[phase] = self.phases.get(phase, 0) + now - self.last
+        self.last = now
+
+    def finish(self, total = "total"):
+
+        # blocked moves only get their rules timed, so they are kept out of the move total
+        for phase, duration in self.phases.items():
+            self.samples[phase].append(duration)
+        self.samples[total].append(self.last - self.started)
+        self.phases = {}
+
+    def summary(self):
+
+        # phase -> count, mean and percentiles in milliseconds
+        summary = {}
+        for phase, samples in self.samples.items():
+            if not samples:
+                continue
+            ordered = sorted(samples)
+            summary[phase] = {"count": len(ordered), "mean": sum(ordered) / len(ordered) / 1e6}
+            for p in PERCENTILES:
+                summary[phase][f"p{p}"] = percentile(ordered, p) / 1e6
+        return summary
+
+    def dump(self, file = None):
+
+        # one line per dump so a session can be followed over time
+        file = file or os.path.join(PERF_FOLDER, "moves.jsonl")
+        os.makedirs(os.path.dirname(file) or ".", exist_ok = True)
+        with open(file, "a") as w:
+            w.write(json.dumps({"time": time.time(), "window": self.window, "phases": self.summary()}) + "\n")
+        return file
+
+class FrameProfiler:
+    def __init__(self):
+
+        # frames left to record, 0 when not recording
+        self.frames_left = 0
+        self.profile = None
+
+    def start(self, frames = 120):
+
+        if self.profile:
+            return
+        self.frames_left = frames
+        self.profile = cProfile.Profile()
+        self.profile.enable()
+
+    def frame(self):
+
+        # called once per frame while recording, returns the stats file once the last frame is in
+        self.frames_left -= 1
+        if self.frames_left > 0:
+            return None
+
+        self.profile.disable()
+        os.makedirs(PERF_FOLDER, exist_ok = True)
+        file = os.path.join(PERF_FOLDER, f"frames {time.strftime('%Y-%m-%d %H-%M-%S')}.prof")
+        self.profile.dump_stats(file)
+        self.profile = None
+        return file
+
+class HitchWatchdog:
+    def __init__(self, budget = 0.05, keep = 16, interval = 0.005):
+
+        # a frame longer than the budget is a hitch, the main thread is sampled every interval while it lasts
+        self.budget = budget
+        self.interval = interval
+        self.main_thread = threading.main_thread().ident
+
+        # time of the last frame, set by the main thread
+        self.heartbeat = time.perf_counter()
+
+        # worst hitches as (duration, number, record), smallest first so it is the one replaced
+        self.keep = keep
+        self.worst = []
+        self.count = 0
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target = self._watch, daemon = True)
+        self.thread.start()
+
+    def beat(self):
+        self.heartbeat = time.perf_counter()
+
+    def _watch(self):
+
+        hitch = None
+        while True:
+            time.sleep(self.interval)
+            beat = self.heartbeat
+
+            # main loop came back
+            if hitch and beat != hitch["beat"]:
+                self._record(beat - hitch["beat"], hitch)
+                hitch = None
+
+            if not hitch and time.perf_counter() - beat > self.budget:
+                hitch = {"beat": beat, "time": time.time(), "stacks": collections.Counter()}
+
+            # where the main thread is stuck, identical stacks are counted instead of kept twice
+            if hitch:
+                frame = sys._current_frames().get(self.main_thread)
+                if frame is not None:
+                    hitch["stacks"]["".join(traceback.format_stack(frame))] += 1
+                del frame
+
+    def _record(self, duration, hitch):
+
+        record = {
+            "duration": duration * 1000,
+            "time": hitch["time"],
+            "stacks": [{"samples": samples, "stack": stack} for stack, samples in hitch["stacks"].most_common()],
+        }
+        with self.lock:
+            self.count += 1
+            if len(self.worst) < self.keep:
+                heapq.heappush(self.worst, (duration, self.count, record))
+            elif duration > self.worst[0][0]:
+                heapq.heapreplace(self.worst, (duration, self.count, record))
+
+    def flush(self, file = None):
+
+        # worst first
+        with self.lock:
+            hitches = [record for duration, number, record in sorted(self.worst, reverse = True)]
+            self.worst.clear()
+
+        file = file or os.path.join(PERF_FOLDER, f"hitches {time.strftime('%Y-%m-%d %H-%M-%S')}.json")
+        os.makedirs(os.path.dirname(file) or ".", exist_ok = True)
+        with open(file, "w") as w:
+            json.dump({"budget": self.budget * 1000, "hitches": hitches}, w, indent = 1)
+        return file
+
+def watchdogFromEnvironment():
+
+    # GRAVKOBAN_WATCHDOG=1 turns it on with the default budget, any other number sets the budget in milliseconds
+    value = os.environ.get("GRAVKOBAN_WATCHDOG", "").strip().lower()
+    if value in ("", "0", "false", "no", "off"):
+        return None
+    if value in ("1", "true", "yes", "on"):
+        return HitchWatchdog()
+    try:
+        return HitchWatchdog(float(value) / 1000)
+    except ValueError:
+        return HitchWatchdog()
+
+def wantPStats():
+    from panda3d.core import ConfigVariableBool
+    return ConfigVariableBool("want-pstats", False).value
+
+def collected(function, name):
+
+    # runs the function inside a PStats collector, only wrapped when PStats is wanted so it costs nothing otherwise
+    from panda3d.core import PStatCollector
+    collector = PStatCollector(name)
+
+    def _collected():
+        collector.start()
+        try:
+            function()
+        finally:
+            collector.stop()
+
+    return _collected
\ No newline at end of file
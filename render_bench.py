@@ -0,0 +1,113 @@
+import random
+import time
+from ursina import *
+
+# share of each block kind in a scene, the rest are crates
+WALL_SHARE = 0.25
+DIRECTION_SHARE = 0.25
+
+# one glowing portal per this many blocks
+BLOCKS_PER_PORTAL = 50
+
+# same as the default player move duration, animations are built with one step per 1/60 s
+MOVE_DURATION = 0.3
+
+def buildScene(count, rng):
+
+    import blocks
+
+    # any cell of the board, stacked or not, only the entity cost matters here
+    cells = [(x, y, level) for level in range(7) for x in range(12) for y in range(12)]
+    rng.shuffle(cells)
+
+    built = []
+    for i in range(count):
+        x, y, level = cells[i % len(cells)]
+        roll = rng.random()
+        if roll < WALL_SHARE:
+            built.append(blocks.WallBlock(x, y))
+        elif roll < WALL_SHARE + DIRECTION_SHARE:
+            built.append(blocks.DirectionBlock(x, y, level, rng.choice(((1, 0), (-1, 0), (0, 1), (0, -1)))))
+        else:
+            built.append(blocks.CrateBlock(x, y, level))
+
+    for i in range(max(1, count // BLOCKS_PER_PORTAL)):
+        x, y, level = cells[(count + i) % len(cells)]
+        built.append(blocks.PortalBlock(x, y, color.green))
+
+    return built
+
+def clearScene(built):
+    for block in built:
+        if hasattr(block, "removed"):
+            block.removed = True
+        destroy(block.entity)
+
+def timeFrames(function, frames):
+
+    # mean milliseconds per call
+    start = time.perf_counter()
+    for i in range(frames):
+        function()
+    return (time.perf_counter() - start) / frames * 1000
+
+def _updateSequences():
+    for sequence in application.sequences[:]:
+        sequence.update()
+
+def measureScene(app, count, frames, rng):
+
+    import game_functions
+
+    built = buildScene(count, rng)
+    for i in range(5):
+        app.step()
+
+    results = {"entities": len(scene.entities)}
+
+    # the per entity loop of main.update
+    results["update()"] = timeFrames(lambda: game_functions.updateSceneEntities(True, Vec2(0, 0)), frames)
+
+    # ursina's own frame task, entity update hooks and running sequences
+    results["ursina frame"] = timeFrames(lambda: app._update(None), frames)
+
+    # every block starts moving at once, like a long chain being pushed
+    start = time.perf_counter()
+    for block in built:
+        block.entity.animate("x", block.entity.x + 10, MOVE_DURATION, curve = curve.linear)
+    results["animate calls"] = (time.perf_counter() - start) * 1000
+    results["sequences"] = timeFrames(_updateSequences, frames)
+
+    # cull traversal and drawing of the whole scene graph
+    results["render"] = timeFrames(base.graphicsEngine.renderFrame, frames)
+
+    clearScene(built)
+    for i in range(5):
+        app.step()
+
+    return results
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description = "Measure the per frame cost of the scene as the number of blocks grows.")
+    parser.add_argument("counts", nargs = "*", type = int, default = [25, 50, 100, 200, 400, 800])
+    parser.add_argument("--frames", type = int, default = 60)
+    parser.add_argument("--window", default = "offscreen", choices = ("offscreen", "none"))
+    parser.add_argument("--seed", type = int, default = 0)
+    args = parser.parse_args()
+
+    app = Ursina(window_type = args.window)
+    rng = random.Random(args.seed)
+
+    columns = ("entities", "update()", "ursina frame", "animate calls", "sequences", "render")
+    rows = [(count, measureScene(app, count, args.frames, rng)) for count in args.counts]
+
+    # milliseconds per frame, and microseconds per block to see where the linear costs start
+    print(f"{'blocks':>7}" + "".join(f"{column:>15}" for column in columns))
+    for count, results in rows:
+        print(f"{count:>7}" + "".join(f"{results[column]:>15.3f}" if column != "entities" else f"{results[column]:>15}" for column in columns))
+    print()
+    print(f"{'blocks':>7}" + "".join(f"{column + ' us/block':>24}" for column in columns[1:]))
+    for count, results in rows:
+        print(f"{count:>7}" + "".join(f"{results[column] * 1000 / count:>24.2f}" for column in columns[1:]))
\ No newline at end of file
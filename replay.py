@@ -0,0 +1,128 @@
+import os
+import simulation
+import solver
+import struct
+
+REPLAY_FOLDER = "replays"
+
+# magic, version, map hash, move count
+HEADER = struct.Struct("<4sB20sI")
+MAGIC = b"GKRP"
+VERSION = 1
+
+# move count of a replay that was never closed, every full group is read
+UNFINISHED = 0xFFFFFFFF
+
+# 8 moves of 3 bits each fit in 3 bytes, the code is the index in solver.MOVE_ORDER
+GROUP_MOVES = 8
+GROUP_BYTES = 3
+
+class ReplayMismatch(Exception):
+    pass
+
+class ReplayWriter:
+    def __init__(self, file, state):
+
+        self.map_hash = simulation.mapHash(state)
+        # read back too, undone moves are taken off the end
+        self.file = open(file, "w+b")
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.map_hash, UNFINISHED))
+
+        # moves that do not fill a group yet
+        self.group = 0
+        self.grouped = 0
+        self.count = 0
+
+    def write(self, key):
+
+        self.group |= solver.MOVE_ORDER.index(key) << 3 * self.grouped
+        self.grouped += 1
+        self.count += 1
+
+        if self.grouped == GROUP_MOVES:
+            self.file.write(self.group.to_bytes(GROUP_BYTES, "little"))
+            self.group = 0
+            self.grouped = 0
+
+    def undo(self):
+
+        if not self.count:
+            return
+
+        # reopen the last full group if the partial one is empty
+        if not self.grouped:
+            self.file.seek(-GROUP_BYTES, os.SEEK_END)
+            self.group = int.from_bytes(self.file.read(GROUP_BYTES), "little")
+            self.file.seek(-GROUP_BYTES, os.SEEK_END)
+            self.file.truncate()
+            self.grouped = GROUP_MOVES
+
+        self.grouped -= 1
+        self.count -= 1
+        self.group &= (1 << 3 * self.grouped) - 1
+
+    def close(self):
+
+        if self.file.closed:
+            return
+
+        # last partial group, then the real move count so the padding is not read as moves
+        if self.grouped:
+            self.file.write(self.group.to_bytes(GROUP_BYTES, "little"))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.map_hash, self.count))
+        self.file.close()
+
+class ReplayReader:
+    def __init__(self, file):
+
+        # a path, or a binary file object such as an uploaded replay in memory
+        self.file = open(file, "rb") if isinstance(file, (str, os.PathLike)) else file
+        magic, version, self.map_hash, self.count = HEADER.unpack(self.file.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            self.file.close()
+            raise ReplayMismatch(f"{file} is not a version {VERSION} replay")
+
+    def moves(self):
+
+        # one group at a time so memory stays the same however long the replay is
+        left = self.count
+        while left:
+            data = self.file.read(GROUP_BYTES)
+            if len(data) < GROUP_BYTES:
+                return
+            group = int.from_bytes(data, "little")
+            for i in range(min(GROUP_MOVES, left)):
+                yield solver.MOVE_ORDER[group >> 3 * i & 7]
+            left -= min(GROUP_MOVES, left)
+
+    def close(self):
+        self.file.close()
+
+def play(file, state):
+
+    # re-run every move the way Player.move does while playing a map
+    reader = ReplayReader(file)
+    try:
+        if reader.map_hash != simulation.mapHash(state):
+            raise ReplayMismatch(f"{file} was recorded on a different map")
+        return simulation.runMoves(state, reader.moves())
+    finally:
+        reader.close()
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description = "Play back a Gravkoban replay without the game.")
+    parser.add_argument("replay")
+    parser.add_argument("map")
+    args = parser.parse_args()
+
+    state = simulation.loadState(args.map)
+    start = time.perf_counter()
+    state = play(args.replay, state)
+    seconds = time.perf_counter() - start
+
+    result = "finished" if simulation.isSolved(state) else "out of moves" if simulation.isFinished(state) else "not finished"
+    print(f"{result}: {state.moves_taken} moves taken, {state.objects_moved} objects pushed, played back in {seconds * 1000:.1f}ms")
\ No newline at end of file
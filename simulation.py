@@ -0,0 +1,519 @@
+import hashlib
+import json
+
+# cell kinds
+EMPTY = 0
+WALL = 1
+CRATE = 2
+DIRECTION = 3
+
+# board size
+BOARD_SIZE = 12
+LEVELS = 7
+GRID_SIZE = BOARD_SIZE * BOARD_SIZE * LEVELS
+
+# movement directions
+DIRECTIONS = {
+    "right": (1, 0),
+    "left": (-1, 0),
+    "up": (0, -1),
+    "down": (0, 1),
+}
+
+# move string keys, upper case keys pull
+MOVE_KEYS = {
+    "w": "up",
+    "a": "left",
+    "s": "down",
+    "d": "right",
+}
+
+# direction plane codes, 0 means the block can move in any direction
+DIRECTION_VECTORS = (None, (1, 0), (-1, 0), (0, -1), (0, 1))
+DIRECTION_CODES = {vector: code for code, vector in enumerate(DIRECTION_VECTORS) if vector}
+
+# cells that can change during play
+_MOVABLE = bytes(int(kind not in (EMPTY, WALL)) for kind in range(256))
+
+# cell classes seen from a move, off the board counts as fixed ahead of the player and empty behind
+FREE = 0
+MOVABLE = 1
+FIXED = 2
+
+# move code -> class of every cell value kind | direction code << 2
+_CELL_CLASSES = [
+    bytes(
+        FREE if kind == EMPTY else FIXED if kind == WALL or (code and code != move_code) else MOVABLE
+        for code in range(len(DIRECTION_VECTORS)) for kind in range(4)
+    )
+    for move_code in range(len(DIRECTION_VECTORS))
+]
+
+# direction name or vector -> (move x, move y, move code, cell stride, cell classes)
+_MOVES = {}
+for name, (move_x, move_y) in DIRECTIONS.items():
+    move_code = DIRECTION_CODES[(move_x, move_y)]
+    _MOVES[name] = _MOVES[(move_x, move_y)] = (move_x, move_y, move_code, (move_x * BOARD_SIZE + move_y) * LEVELS, _CELL_CLASSES[move_code])
+
+# move string key -> (direction, pull)
+_KEYS = {key: (MOVE_KEYS[key.lower()], key.isupper()) for key in "wasdWASD"}
+
+# outcome of a pattern that needs the full chain loop
+LONG_CHAIN = "long chain"
+
+def _outcome(first, second, behind, portal, stack):
+
+    # None if blocked, otherwise (blocks pushed, block pulled, player stopped by a falling stack)
+    if first == FIXED:
+        return None
+
+    pushed = 0
+    if first == MOVABLE:
+        if portal or second == FIXED:
+            return None
+        if second == MOVABLE:
+            return LONG_CHAIN
+        pushed = 1
+
+    if behind == FIXED:
+        return None
+
+    # if blocks are going to fall the player cannot move, so cannot pull anything
+    pulled = behind == MOVABLE
+    if pulled and pushed and stack:
+        return None
+
+    return pushed, pulled, bool(pushed and stack)
+
+# pattern of the first two cells ahead, the cell behind, a portal in the second cell and a stack on the first
+PATTERNS = [
+    _outcome(first, second, behind, portal, stack)
+    for stack in range(2) for portal in range(2) for behind in range(3) for second in range(3) for first in range(3)
+]
+
+def index(x, y, level = 0):
+
+    # columns are contiguous so stacks can be scanned without jumping around
+    return (x * BOARD_SIZE + y) * LEVELS + level
+
+def coordinate(i):
+    column, level = divmod(i, LEVELS)
+    return (column // BOARD_SIZE, column % BOARD_SIZE, level)
+
+def column(x, y):
+    return x * BOARD_SIZE + y
+
+class Board:
+    __slots__ = ("start", "end", "max_moves", "max_moved", "map_name", "block_start", "enforce_limits")
+
+    def __init__(self, start, end, max_moves = 1000, max_moved = 1000, map_name = "Untitled Map", block_start = True, enforce_limits = True):
+
+        # portals
+        self.start = tuple(start)
+        self.end = tuple(end)
+
+        # movement restrictions
+        self.max_moves = max_moves
+        self.max_moved = max_moved
+
+        # data
+        self.map_name = map_name
+
+        # rules that only apply while playing a map
+        self.block_start = block_start
+        self.enforce_limits = enforce_limits
+
+class GameState:
+    __slots__ = ("board", "grid", "directions", "heights", "player", "moves_taken", "objects_moved")
+
+    def __init__(self, board, grid = None, directions = None, player = (1, 1), moves_taken = 0, objects_moved = 0, heights = None):
+
+        # static map data
+        self.board = board
+
+        # cell kinds and direction codes, indexed with index(x, y, level)
+        self.grid = bytearray(GRID_SIZE) if grid is None else grid
+        self.directions = bytearray(GRID_SIZE) if directions is None else directions
+
+        # number of blocks stacked from the ground up in every column
+        if heights is None:
+            heights = bytearray(BOARD_SIZE * BOARD_SIZE)
+            for c in range(BOARD_SIZE * BOARD_SIZE):
+                heights[c] = _supportHeight(self.grid, c * LEVELS)
+        self.heights = heights
+
+        # player
+        self.player = tuple(player)
+
+        # stats
+        self.moves_taken = moves_taken
+        self.objects_moved = objects_moved
+
+    def copy(self):
+        return GameState(self.board, self.grid[:], self.directions[:], self.player, self.moves_taken, self.objects_moved, self.heights[:])
+
+    def key(self):
+        return bytes(self.grid) + bytes(self.directions) + bytes(self.player)
+
+    def pack(self):
+
+        # player, then index, kind and direction of every movable block since walls never move
+        grid = self.grid
+        movable = grid.translate(_MOVABLE)
+        data = bytearray(self.player)
+        i = movable.find(1)
+        while i != -1:
+            data += bytes((i >> 8, i & 255, grid[i], self.directions[i]))
+            i = movable.find(1, i + 1)
+        return bytes(data)
+
+    def static(self):
+
+        # copy with only the walls left, used to unpack states of the same map
+        state = self.copy()
+        movable = self.grid.translate(_MOVABLE)
+        i = movable.find(1)
+        while i != -1:
+            state.grid[i] = EMPTY
+            state.directions[i] = 0
+            state.heights[i // LEVELS] = _supportHeight(state.grid, i - i % LEVELS)
+            i = movable.find(1, i + 1)
+        return state
+
+    def kindAt(self, x, y, level = 0):
+        return self.grid[index(x, y, level)]
+
+    def directionAt(self, x, y, level = 0):
+        return DIRECTION_VECTORS[self.directions[index(x, y, level)]]
+
+    def heightAt(self, x, y):
+        return self.heights[column(x, y)]
+
+    def setBlock(self, x, y, level, kind, direction = None):
+        i = index(x, y, level)
+        self.grid[i] = kind
+        self.directions[i] = DIRECTION_CODES[tuple(direction)] if direction else 0
+        self.heights[column(x, y)] = _supportHeight(self.grid, i - level)
+
+    def applyMoves(self, moves):
+
+        # (from, to) block moves in order, such as a diff or the reverse of one
+        for coord, target in moves:
+            self.setBlock(*target, self.kindAt(*coord), self.directionAt(*coord))
+            self.setBlock(*coord, EMPTY)
+
+    def blocks(self):
+
+        # (position, kind, direction) of every occupied cell
+        grid = self.grid
+        for i in range(GRID_SIZE):
+            if grid[i]:
+                yield coordinate(i), grid[i], DIRECTION_VECTORS[self.directions[i]]
+
+class MoveDiff:
+    __slots__ = ("moved", "dropped", "player_from", "player_to")
+
+    def __init__(self, moved, dropped, player_from, player_to):
+
+        # (from, to) pairs in the order they have to be applied
+        self.moved = moved
+        self.dropped = dropped
+
+        # player
+        self.player_from = player_from
+        self.player_to = player_to
+
+def _inBoard(x, y):
+    return 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE
+
+def _supportHeight(grid, base):
+
+    # count blocks from the ground up until the first gap
+    height = 0
+    while height < LEVELS and grid[base + height]:
+        height += 1
+    return height
+
+def _moveCell(state, i, target):
+    grid = state.grid
+    directions = state.directions
+
+    grid[target] = grid[i]
+    directions[target] = directions[i]
+    grid[i] = EMPTY
+    directions[i] = 0
+
+    # only the two columns involved can change height
+    state.heights[i // LEVELS] = _supportHeight(grid, i - i % LEVELS)
+    state.heights[target // LEVELS] = _supportHeight(grid, target - target % LEVELS)
+
+def settle(state, bases):
+
+    # a ground cell left empty lets the stack resting on it drop one level, blocks above a gap stay where they are
+    grid = state.grid
+    dropped = []
+    for base in bases:
+        if grid[base]:
+            continue
+        level = 1
+        while level < LEVELS and grid[base + level]:
+            _moveCell(state, base + level, base + level - 1)
+            dropped.append((coordinate(base + level), coordinate(base + level - 1)))
+            level += 1
+
+    return dropped
+
+def _chain(state, new_position, move_x, move_y, move_code, stride, pull):
+
+    # general loop for chains of two blocks or more, returns (affected cells, player blocked) or None if blocked
+    board = state.board
+    grid = state.grid
+    directions = state.directions
+    heights = state.heights
+
+    start = index(*board.start) if board.block_start else -1
+    end = index(*board.end)
+
+    # check if can move affected blocks
+    affected_coordinates = {}
+    has_stack = False
+    x, y = new_position
+    i = index(x, y)
+    while True:
+
+        if not _inBoard(x, y):
+            return None
+
+        # check if its start or end portal
+        if affected_coordinates and i in (start, end):
+            return None
+
+        # hit nothing?
+        kind = grid[i]
+        if kind == EMPTY:
+            break
+
+        # check if its movable
+        if kind == WALL:
+            return None
+
+        # check if moving in correct direction
+        if directions[i] and directions[i] != move_code:
+            return None
+
+        # add to affected list and continue
+        affected_coordinates[i] = i + stride
+        has_stack = has_stack or heights[i // LEVELS] > 1
+
+        x += move_x
+        y += move_y
+        i += stride
+
+    # a block dropping into the players way stops the player
+    player_blocked = bool(affected_coordinates) and heights[column(*new_position)] > 1
+
+    player_x, player_y = state.player
+    pull_x, pull_y = player_x - move_x, player_y - move_y
+    if pull and _inBoard(pull_x, pull_y) and grid[index(pull_x, pull_y)] != EMPTY:
+
+        i = index(pull_x, pull_y)
+
+        # check if its movable
+        if grid[i] == WALL:
+            return None
+
+        # check if moving in correct direction
+        if directions[i] and directions[i] != move_code:
+            return None
+
+        # if blocks are going to fall, player cannot move, so cannot pull anything
+        if has_stack:
+            return None
+
+        affected_coordinates[i] = i + stride
+
+    return affected_coordinates, player_blocked
+
+def step(state, direction, pull = False):
+
+    board = state.board
+    grid = state.grid
+    directions = state.directions
+
+    # get correct movements
+    move_x, move_y, move_code, stride, classes = _MOVES[direction if isinstance(direction, str) else tuple(direction)]
+
+    player_x, player_y = state.player
+    x, y = new_position = (player_x + move_x, player_y + move_y)
+
+    # classify the few cells most moves depend on and look the outcome up
+    if not (0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE):
+        return state, None
+    i = (x * BOARD_SIZE + y) * LEVELS
+    first = classes[grid[i] | directions[i] << 2]
+    if first == FIXED:
+        return state, None
+
+    second = portal = stack = 0
+    if first == MOVABLE:
+        stack = state.heights[i // LEVELS] > 1
+        if 0 <= x + move_x < BOARD_SIZE and 0 <= y + move_y < BOARD_SIZE:
+            second = classes[grid[i + stride] | directions[i + stride] << 2]
+            portal = i + stride == index(*board.end) or (board.block_start and i + stride == index(*board.start))
+        else:
+            second = FIXED
+
+    behind = FREE
+    if pull:
+        pull_x, pull_y = player_x - move_x, player_y - move_y
+        if 0 <= pull_x < BOARD_SIZE and 0 <= pull_y < BOARD_SIZE:
+            p = (pull_x * BOARD_SIZE + pull_y) * LEVELS
+            behind = classes[grid[p] | directions[p] << 2]
+
+    outcome = PATTERNS[first + 3 * second + 9 * behind + 27 * portal + 54 * stack]
+    if outcome is None:
+        return state, None
+
+    # long chains go through the general loop
+    if outcome is LONG_CHAIN:
+        chain = _chain(state, new_position, move_x, move_y, move_code, stride, pull)
+        if chain is None:
+            return state, None
+        affected_coordinates, player_blocked = chain
+    else:
+        pushed, pulled, player_blocked = outcome
+        affected_coordinates = {}
+        if pushed:
+            affected_coordinates[i] = i + stride
+        if pulled:
+            affected_coordinates[p] = p + stride
+
+    # cant move above move limit
+    if board.enforce_limits and len(affected_coordinates) > board.max_moved:
+        return state, None
+
+    new_state = state.copy()
+
+    # move all affected blocks
+    moved = []
+    for i in reversed(affected_coordinates):
+        _moveCell(new_state, i, affected_coordinates[i])
+        moved.append((coordinate(i), coordinate(affected_coordinates[i])))
+
+    # settle the stacks of every column a block left
+    dropped = settle(new_state, affected_coordinates)
+
+    new_state.objects_moved += len(moved) + len(dropped)
+
+    # move
+    if not player_blocked:
+        new_state.player = new_position
+        new_state.moves_taken += 1
+
+    return new_state, MoveDiff(moved, dropped, state.player, new_state.player)
+
+def stepKey(state, key):
+    return step(state, *_KEYS[key])
+
+def runMoves(state, moves):
+
+    # blocked moves do nothing, same as pressing the key in game
+    for key in moves:
+        if isFinished(state):
+            break
+        state = stepKey(state, key)[0]
+    return state
+
+def unpack(static, data, moves_taken = 0, objects_moved = 0):
+
+    state = static.copy()
+    state.player = (data[0], data[1])
+    state.moves_taken = moves_taken
+    state.objects_moved = objects_moved
+
+    grid = state.grid
+    for offset in range(2, len(data), 4):
+        i = data[offset] << 8 | data[offset + 1]
+        grid[i] = data[offset + 2]
+        state.directions[i] = data[offset + 3]
+
+    # columns that got blocks back
+    for offset in range(2, len(data), 4):
+        i = data[offset] << 8 | data[offset + 1]
+        state.heights[i // LEVELS] = _supportHeight(grid, i - i % LEVELS)
+
+    return state
+
+def isFinished(state):
+    return state.player == state.board.end or (state.board.enforce_limits and state.moves_taken >= state.board.max_moves)
+
+def isSolved(state):
+    return state.player == state.board.end and not (state.board.enforce_limits and state.moves_taken >= state.board.max_moves)
+
+def stateFromMapData(map_data, player = None):
+
+    board = Board(
+        map_data["start"],
+        map_data["end"],
+        map_data["max_moves"],
+        map_data["max_moved"],
+        map_data["map_name"],
+    )
+    state = GameState(board, player = board.start if player is None else player)
+
+    # board walls
+    for x in range(BOARD_SIZE):
+        for y in range(BOARD_SIZE):
+            if x in (0, BOARD_SIZE - 1) or y in (0, BOARD_SIZE - 1):
+                state.setBlock(x, y, 0, WALL)
+
+    # walls
+    for position in map_data["WallBlock"]:
+        state.setBlock(*position[:2], 0, WALL)
+
+    # crate blocks
+    for position in map_data["CrateBlock"]:
+        state.setBlock(*position, CRATE)
+
+    # direction blocks
+    for position in map_data["DirectionBlock"]:
+        state.setBlock(*position[:3], DIRECTION, position[3])
+
+    return state
+
+def mapHash(state):
+
+    # everything about a map as it is loaded, 20 bytes
+    board = state.board
+    layout = repr((board.start, board.end, board.max_moves, board.max_moved, board.block_start, board.enforce_limits)).encode()
+    return hashlib.sha1(bytes(state.grid) + bytes(state.directions) + layout).digest()
+
+def stateToMapData(state):
+
+    # same layout as map_helper.boardToJson
+    board = state.board
+    map_data = {
+        "WallBlock": [], "CrateBlock": [], "DirectionBlock": [],
+        "max_moves": board.max_moves, "max_moved": board.max_moved,
+        "start": board.start,
+        "end": board.end,
+        "map_name": board.map_name,
+    }
+
+    for position, kind, direction in state.blocks():
+        if kind == WALL:
+            map_data["WallBlock"].append(list(position[:2]))
+        elif kind == CRATE:
+            map_data["CrateBlock"].append(list(position))
+        elif kind == DIRECTION:
+            map_data["DirectionBlock"].append([*position, list(direction)])
+
+    return map_data
+
+def loadState(file):
+
+    # parse map json
+    with open(file, "r") as r:
+        map_data = json.load(r)
+
+    return stateFromMapData(map_data)
\ No newline at end of file
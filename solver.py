@@ -0,0 +1,172 @@
+import heapq
+import math
+import random
+import simulation
+
+# every key the player can press, upper case keys pull
+MOVE_ORDER = "wasdWASD"
+
+# zobrist keys, fixed seed so hashes are the same in every process and run
+_random = random.Random(0x67726176)
+_CELL_CODES = 4 * len(simulation.DIRECTION_VECTORS)
+ZOBRIST_CELLS = [0 if code == 0 else _random.getrandbits(64) for i in range(simulation.GRID_SIZE) for code in range(_CELL_CODES)]
+ZOBRIST_PLAYER = [_random.getrandbits(64) for c in range(simulation.BOARD_SIZE * simulation.BOARD_SIZE)]
+
+class SearchResult:
+    __slots__ = ("moves", "par", "expanded", "complete")
+
+    def __init__(self, moves, par, expanded, complete):
+
+        # solution, None if no solution was found
+        self.moves = moves
+        self.par = par
+
+        # stats
+        self.expanded = expanded
+
+        # false if the search gave up before proving anything
+        self.complete = complete
+
+    @property
+    def solved(self):
+        return self.moves is not None
+
+def _cellKey(state, i):
+    return ZOBRIST_CELLS[i * _CELL_CODES + state.grid[i] * len(simulation.DIRECTION_VECTORS) + state.directions[i]]
+
+def zobristHash(state):
+
+    h = ZOBRIST_PLAYER[simulation.column(*state.player)]
+    for i in range(simulation.GRID_SIZE):
+        if state.grid[i]:
+            h ^= _cellKey(state, i)
+    return h
+
+def updateHash(h, state, new_state, diff):
+
+    # only cells in the diff changed
+    changed = set()
+    for coord, target in diff.moved + diff.dropped:
+        changed.add(simulation.index(*coord))
+        changed.add(simulation.index(*target))
+
+    for i in changed:
+        h ^= _cellKey(state, i) ^ _cellKey(new_state, i)
+
+    return h ^ ZOBRIST_PLAYER[simulation.column(*state.player)] ^ ZOBRIST_PLAYER[simulation.column(*new_state.player)]
+
+def manhattan(state):
+
+    # the player moves at most one cell per counted move
+    end = state.board.end
+    return abs(state.player[0] - end[0]) + abs(state.player[1] - end[1])
+
+def successors(state):
+
+    for key in MOVE_ORDER:
+
+        # pulling with nothing behind is the same as a normal move
+        if key.isupper():
+            move_x, move_y = simulation.DIRECTIONS[simulation.MOVE_KEYS[key.lower()]]
+            if not state.kindAt(state.player[0] - move_x, state.player[1] - move_y):
+                continue
+
+        new_state, diff = simulation.stepKey(state, key)
+        if diff is not None:
+            yield key, new_state, diff
+
+def _path(parents, h):
+
+    moves = []
+    while parents[h] is not None:
+        h, key = parents[h]
+        moves.append(key)
+    return "".join(reversed(moves))
+
+def solve(state, heuristic = manhattan, max_expansions = None, analysis = None):
+
+    static = state.static()
+    start_moves = state.moves_taken
+
+    # transposition table, hash -> fewest moves taken to reach it
+    start_hash = zobristHash(state)
+    best = {start_hash: state.moves_taken}
+    parents = {start_hash: None}
+
+    # deeper states first on ties
+    counter = 0
+    heap = [(state.moves_taken + heuristic(state), -state.moves_taken, counter, start_hash, state.pack())]
+
+    expanded = 0
+    while heap:
+        f, g, _, h, packed = heapq.heappop(heap)
+        g = -g
+
+        # already reached with fewer moves
+        if best[h] < g:
+            continue
+
+        state = simulation.unpack(static, packed, g)
+
+        if simulation.isSolved(state):
+            return SearchResult(_path(parents, h), g - start_moves, expanded, True)
+
+        # out of moves
+        if simulation.isFinished(state):
+            continue
+
+        expanded += 1
+        if max_expansions is not None and expanded > max_expansions:
+            return SearchResult(None, None, expanded, False)
+
+        for key, new_state, diff in successors(state):
+
+            # a block got stuck somewhere that cuts the player off from the end
+            if analysis is not None and analysis.isDoomedMove(new_state, diff):
+                continue
+
+            new_hash = updateHash(h, state, new_state, diff)
+            new_g = new_state.moves_taken
+            if new_g >= best.get(new_hash, new_g + 1):
+                continue
+
+            # the heuristic proved the end cannot be reached from here
+            estimate = heuristic(new_state)
+            if estimate == math.inf:
+                continue
+
+            best[new_hash] = new_g
+            parents[new_hash] = (h, key)
+            counter += 1
+            heapq.heappush(heap, (new_g + estimate, -new_g, counter, new_hash, new_state.pack()))
+
+    return SearchResult(None, None, expanded, True)
+
+if __name__ == "__main__":
+    import argparse
+    import map_analysis
+    import os
+
+    parser = argparse.ArgumentParser(description = "Find the fewest moves needed to finish Gravkoban maps.")
+    parser.add_argument("maps", nargs = "+")
+    parser.add_argument("--max-expansions", type = int, default = None)
+    parser.add_argument("--pdb", action = "store_true", help = "use cached pattern databases as the heuristic")
+    args = parser.parse_args()
+
+    for file in args.maps:
+        state = simulation.loadState(file)
+
+        heuristic = manhattan
+        if args.pdb:
+            import pattern_database
+            heuristic = pattern_database.PatternDatabase(state).heuristic
+
+        result = solve(state, heuristic, args.max_expansions, map_analysis.MapAnalysis(state))
+        name = os.path.splitext(os.path.basename(file))[0]
+
+        if result.solved:
+            print(f"{name}: par {result.par} ({result.moves}), {result.expanded} states expanded")
+        elif result.complete:
+            print(f"{name}: unsolvable, {result.expanded} states expanded")
+        else:
+            print(f"{name}: gave up after {result.expanded} states")
\ No newline at end of file
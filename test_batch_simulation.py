@@ -0,0 +1,29 @@
+import batch_simulation
+import numpy as np
+import simulation
+import solver
+
+def _gappedStates():
+
+    # every column kind gravity can meet, pushed right or pulled up from (3, 5)
+    columns = ([0, 2], [0, 1, 3], [0, 1, 2], [0, 3, 4, 6], [0])
+    states = []
+    for levels in columns:
+        board = simulation.Board((1, 1), (10, 10))
+        state = simulation.GameState(board, player = (3, 5))
+        for level in levels:
+            state.setBlock(4, 5, level, simulation.CRATE)
+            state.setBlock(3, 6, level, simulation.CRATE)
+        states.append(state)
+    return states
+
+def test_gapped_columns_match_scalar():
+    for key in "dW":
+        states = _gappedStates()
+        batch = batch_simulation.BatchState(states)
+        blocked = batch_simulation.step(batch, np.full(len(states), solver.MOVE_ORDER.index(key)))
+        for board, state in enumerate(states):
+            new_state, diff = simulation.stepKey(state, key)
+            assert bool(blocked[board]) == (diff is None)
+            assert batch.state(board).key() == new_state.key()
+            assert batch.objects_moved[board] == new_state.objects_moved
\ No newline at end of file
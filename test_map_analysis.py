@@ -0,0 +1,31 @@
+import map_analysis
+import simulation
+import solver
+
+def _cornerState(levels):
+
+    # the only way out is pulling the crates onto the start, the cell the player just stepped off
+    board = simulation.Board((3, 3), (1, 3))
+    state = simulation.GameState(board, player = (3, 3))
+    for x in range(simulation.BOARD_SIZE):
+        for y in range(simulation.BOARD_SIZE):
+            if x in (0, simulation.BOARD_SIZE - 1) or y in (0, simulation.BOARD_SIZE - 1):
+                state.setBlock(x, y, 0, simulation.WALL)
+    for x, y in ((1, 2), (1, 4), (2, 1), (2, 4), (1, 1), (3, 4)):
+        state.setBlock(x, y, 0, simulation.WALL)
+    for level in range(levels):
+        state.setBlock(2, 3, level, simulation.CRATE)
+    return state
+
+def test_pull_onto_start_is_not_dead():
+    state = _cornerState(1)
+    analysis = map_analysis.MapAnalysis(state)
+    assert not analysis.isDead(2, 3)
+    assert analysis.warnings(state) == []
+
+def test_analysis_keeps_solutions():
+    state = _cornerState(2)
+    plain = solver.solve(state)
+    pruned = solver.solve(state, analysis = map_analysis.MapAnalysis(state))
+    assert plain.solved
+    assert pruned.solved and pruned.par == plain.par
\ No newline at end of file
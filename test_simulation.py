@@ -0,0 +1,35 @@
+import simulation
+
+def _gappedState():
+
+    # a crate on the ground and one floating two levels up with nothing in between
+    board = simulation.Board((1, 1), (10, 10))
+    state = simulation.GameState(board, player = (3, 5))
+    state.setBlock(4, 5, 0, simulation.CRATE)
+    state.setBlock(4, 5, 2, simulation.CRATE)
+    return state
+
+def test_floating_block_stays_over_gap():
+    new_state, diff = simulation.stepKey(_gappedState(), "d")
+    assert new_state.player == (4, 5)
+    assert new_state.kindAt(4, 5, 0) == simulation.EMPTY
+    assert new_state.kindAt(4, 5, 2) == simulation.CRATE
+    assert diff.dropped == []
+
+def test_stack_drops_one_level():
+    state = _gappedState()
+    state.setBlock(4, 5, 1, simulation.CRATE)
+    new_state, diff = simulation.stepKey(state, "d")
+    assert new_state.player == (3, 5)
+    assert [new_state.kindAt(4, 5, level) for level in range(4)] == [simulation.CRATE, simulation.CRATE, simulation.EMPTY, simulation.EMPTY]
+    assert diff.dropped == [((4, 5, 1), (4, 5, 0)), ((4, 5, 2), (4, 5, 1))]
+
+def test_gapped_stack_only_drops_below_gap():
+    state = _gappedState()
+    state.setBlock(4, 5, 1, simulation.CRATE)
+    state.setBlock(4, 5, 2, simulation.EMPTY)
+    state.setBlock(4, 5, 3, simulation.CRATE)
+    new_state, diff = simulation.stepKey(state, "d")
+    assert new_state.player == (3, 5)
+    assert [new_state.kindAt(4, 5, level) for level in range(4)] == [simulation.CRATE, simulation.EMPTY, simulation.EMPTY, simulation.CRATE]
+    assert new_state.heightAt(4, 5) == 1
\ No newline at end of file
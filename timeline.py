@@ -0,0 +1,53 @@
+import simulation
+import solver
+
+# moves between two saved boards, seeking plays at most this many moves
+CHECKPOINT_EVERY = 64
+
+class Timeline:
+    def __init__(self, state, every = CHECKPOINT_EVERY):
+
+        # walls only, checkpoints are packed movable blocks on top of it
+        self.static = state.static()
+        self.every = every
+
+        # move codes, indices in solver.MOVE_ORDER
+        self.moves = bytearray()
+
+        # (packed state, moves taken, objects moved) every few moves, the first one is the start
+        self.checkpoints = [(state.pack(), state.moves_taken, state.objects_moved)]
+
+        # move the board is at, later moves can still be seeked to
+        self.position = 0
+
+    def __len__(self):
+        return len(self.moves)
+
+    def append(self, key, state):
+
+        # a new move after seeking back replaces every move after it
+        del self.moves[self.position:]
+        del self.checkpoints[self.position // self.every + 1:]
+
+        self.moves.append(solver.MOVE_ORDER.index(key))
+        self.position += 1
+
+        if self.position % self.every == 0:
+            self.checkpoints.append((state.pack(), state.moves_taken, state.objects_moved))
+
+    def keys(self, start, stop):
+        return [solver.MOVE_ORDER[code] for code in self.moves[start:stop]]
+
+    def stateAt(self, move):
+
+        # nearest checkpoint at or before the move, then the moves after it
+        checkpoint = min(move // self.every, len(self.checkpoints) - 1)
+        data, moves_taken, objects_moved = self.checkpoints[checkpoint]
+        state = simulation.unpack(self.static, data, moves_taken, objects_moved)
+        for key in self.keys(checkpoint * self.every, move):
+            state = simulation.stepKey(state, key)[0]
+        return state
+
+    def seek(self, move):
+        self.position = max(0, min(move, len(self.moves)))
+        return self.stateAt(self.position)
\ No newline at end of file
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import map_analysis
+import multiprocessing
+import os
+import pattern_database
+import simulation
+import solver
+
+# bump when the checks or the rules change so old sidecars are redone
+VERSION = 1
+
+SIDECAR_FOLDER = "pars"
+
+def contentHash(data):
+    return hashlib.sha1(repr(VERSION).encode() + data).hexdigest()
+
+def sidecarPath(file, folder = SIDECAR_FOLDER):
+
+    # keyed by the whole path, maps with the same name in different folders get their own sidecar
+    name = os.path.splitext(os.path.basename(file))[0]
+    key = hashlib.sha1(os.path.abspath(file).encode()).hexdigest()[:12]
+    return os.path.join(folder, f"{name} {key}.json")
+
+def _inBoard(position):
+    return 0 <= position[0] < simulation.BOARD_SIZE and 0 <= position[1] < simulation.BOARD_SIZE
+
+def _onBorder(position):
+    return position[0] in (0, simulation.BOARD_SIZE - 1) or position[1] in (0, simulation.BOARD_SIZE - 1)
+
+def _isCoordinate(value, length):
+    return isinstance(value, list) and len(value) == length and all(isinstance(part, int) and not isinstance(part, bool) for part in value)
+
+def _shapeErrors(map_data):
+
+    # every entry has the shape the game reads, checked before anything indexes into it
+    errors = []
+    for name in ("start", "end"):
+        if not _isCoordinate(map_data[name], 2):
+            errors.append(f"The {name} portal must be an x and y, not {map_data[name]!r}!")
+
+    for key in ("max_moves", "max_moved"):
+        if not isinstance(map_data[key], int) or isinstance(map_data[key], bool) or map_data[key] < 0:
+            errors.append(f"{key} must be a whole number!")
+
+    for key, length in (("WallBlock", 2), ("CrateBlock", 3), ("DirectionBlock", 4)):
+        if not isinstance(map_data[key], list):
+            errors.append(f"{key} must be a list!")
+            continue
+        for entry in map_data[key]:
+            if key == "DirectionBlock":
+                valid = isinstance(entry, list) and len(entry) == 4 and _isCoordinate(entry[:3], 3) and _isCoordinate(entry[3], 2)
+            else:
+                valid = _isCoordinate(entry, length)
+            if not valid:
+                errors.append(f"The {key} entry {entry!r} is not a valid position!")
+
+    return errors
+
+def structureErrors(map_data):
+
+    if not isinstance(map_data, dict):
+        return ["The map is not a json object!"]
+
+    for key in ("WallBlock", "CrateBlock", "DirectionBlock", "max_moves", "max_moved", "start", "end", "map_name"):
+        if not key in map_data:
+            return [f"Missing {key}!"]
+
+    errors = _shapeErrors(map_data)
+    if errors:
+        return errors
+
+    # portals
+    start, end = tuple(map_data["start"]), tuple(map_data["end"])
+    for name, portal in (("start", start), ("end", end)):
+        if not _inBoard(portal):
+            errors.append(f"The {name} portal is off the board!")
+        elif _onBorder(portal):
+            errors.append(f"The {name} portal is on the board wall!")
+    if start == end:
+        errors.append("Start and end are on the same cell!")
+
+    # blocks, walls only on the ground
+    cells = {}
+    positions = [(tuple(position) + (0,), "wall") for position in map_data["WallBlock"]]
+    positions += [(tuple(position), "crate") for position in map_data["CrateBlock"]]
+    positions += [(tuple(position[:3]), "direction block") for position in map_data["DirectionBlock"]]
+
+    for position, name in positions:
+        if not _inBoard(position) or not 0 <= position[2] < simulation.LEVELS:
+            errors.append(f"The {name} at {position} is off the board!")
+
+        # the board wall is added on load, only walls may be listed there
+        elif name != "wall" and _onBorder(position):
+            errors.append(f"The {name} at {position} is on the board wall!")
+        elif position in cells:
+            errors.append(f"The {name} at {position} overlaps a {cells[position]}!")
+        else:
+            cells[position] = name
+
+    for position in map_data["DirectionBlock"]:
+        if not tuple(position[3]) in simulation.DIRECTION_CODES:
+            errors.append(f"The direction block at {tuple(position[:3])} has no direction!")
+
+    # same checks as canPlaceBlock in the editor
+    for position, name in cells.items():
+        x, y, level = position
+        if level > 0 and not (x, y, level - 1) in cells:
+            errors.append(f"The {name} at {position} is floating!")
+        if level == 0 and (x, y) in (start, end):
+            errors.append(f"The {name} at {position} is on a portal!")
+
+    return errors
+
+def validate(file, data, max_expansions = None):
+
+    # one sidecar entry, the solution is only searched for when the map is sound
+    report = {"hash": contentHash(data), "errors": [], "par": None, "moves": None, "complete": True}
+
+    try:
+        map_data = json.loads(data)
+    except ValueError as error:
+        report["errors"].append(f"Not valid json: {error}")
+        return report
+
+    report["errors"] = structureErrors(map_data)
+    if report["errors"]:
+        return report
+
+    # the pattern database of the map is cached on disk, later runs start from it
+    state = simulation.stateFromMapData(map_data)
+    heuristic = pattern_database.PatternDatabase(state).heuristic
+    result = solver.solve(state, heuristic, max_expansions, map_analysis.MapAnalysis(state))
+
+    report["par"] = result.par
+    report["moves"] = result.moves
+    report["complete"] = result.complete
+    if result.complete and not result.solved:
+        report["errors"].append("No solution within the move limit!")
+
+    return report
+
+def _validateTask(args):
+    file, data, max_expansions = args
+
+    # one broken map is reported as one broken map, the rest of the run goes on
+    try:
+        return file, validate(file, data, max_expansions)
+    except Exception as error:
+        return file, {"hash": contentHash(data), "errors": [f"Validation failed: {error!r}"], "par": None, "moves": None, "complete": True}
+
+def validateAll(files, workers = None, max_expansions = None, folder = SIDECAR_FOLDER, force = False):
+
+    reports = {}
+    stale = []
+
+    # sidecars of unchanged maps are reused without touching the pool
+    for file in files:
+        with open(file, "rb") as r:
+            data = r.read()
+
+        path = sidecarPath(file, folder)
+        if not force and os.path.exists(path):
+            with open(path, "r") as r:
+                report = json.load(r)
+            if report.get("hash") == contentHash(data) and report.get("complete"):
+                reports[file] = report
+                continue
+
+        stale.append((file, data, max_expansions))
+
+    if stale:
+        os.makedirs(folder, exist_ok = True)
+        with multiprocessing.Pool(workers) as pool:
+            for file, report in pool.imap_unordered(_validateTask, stale):
+                with open(sidecarPath(file, folder), "w") as w:
+                    json.dump(report, w)
+                reports[file] = report
+
+    return reports
+
+if __name__ == "__main__":
+    import argparse
+    import glob
+    import sys
+
+    parser = argparse.ArgumentParser(description = "Check every Gravkoban map and write par sidecars.")
+    parser.add_argument("maps", nargs = "*")
+    parser.add_argument("--workers", type = int, default = None)
+    parser.add_argument("--max-expansions", type = int, default = None)
+    parser.add_argument("--folder", default = SIDECAR_FOLDER)
+    parser.add_argument("--force", action = "store_true", help = "ignore existing sidecars")
+    args = parser.parse_args()
+
+    files = args.maps or sorted(glob.glob("maps/*.json"))
+    reports = validateAll(files, args.workers, args.max_expansions, args.folder, args.force)
+
+    failed = False
+    for file in files:
+        report = reports[file]
+        name = os.path.splitext(os.path.basename(file))[0]
+
+        if report["errors"]:
+            failed = True
+            for error in report["errors"]:
+                print(f"{name}: {error}")
+        elif report["par"] is not None:
+            print(f"{name}: ok, par {report['par']}")
+        else:
+            print(f"{name}: gave up looking for a solution")
+
+    sys.exit(1 if failed else 0)
\ No newline at end of file